@@ -30,8 +30,22 @@ async function connectRabbitMQ() {
         rabbitChannel = await connection.createChannel();
 
         // Declare queues
-        await rabbitChannel.assertQueue('push.queue', { durable: true });
-        await rabbitChannel.assertQueue('email.queue', { durable: true });
+        // Must match push-service's declaration exactly; whichever side
+        // declares second would otherwise fail with PRECONDITION_FAILED
+        await rabbitChannel.assertQueue('push.queue', {
+            durable: true,
+            deadLetterExchange: 'push.dlx',
+            deadLetterRoutingKey: 'retry'
+        });
+        // Must match email-service's declaration exactly; whichever side
+        // declares second would otherwise fail with PRECONDITION_FAILED
+        await rabbitChannel.assertQueue('email.queue', {
+            durable: true,
+            messageTtl: 86400000, // 24 hours
+            maxLength: 10000,
+            deadLetterExchange: 'email.dlx',
+            deadLetterRoutingKey: 'retry'
+        });
 
         console.log('✅ Connected to RabbitMQ');
     } catch (error) {
@@ -129,7 +143,6 @@ app.post('/notify/push', async (req: Request, res: Response) => {
             device_token,
             language_code,
             priority,
-            retry_count: 0,
             timestamp: new Date().toISOString()
         };
 
@@ -191,7 +204,6 @@ app.post('/notify/email', async (req: Request, res: Response) => {
             recipient_email,
             language_code,
             priority,
-            retry_count: 0,
             timestamp: new Date().toISOString()
         };
 
@@ -1,9 +1,14 @@
 """Configuration settings"""
-from pydantic_settings import BaseSettings
-from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True
+    )
+    
     # Service
     service_name: str = "email-service"
     service_version: str = "1.0.0"
@@ -17,19 +22,31 @@ class Settings(BaseSettings):
     
     # Template Service
     template_service_url: str = "http://template-service:3004"
+    template_cache_ttl: float = 60.0  # seconds to reuse an identical render
+    template_cache_max_size: int = 1000
     
     # Worker
     worker_enabled: bool = True
-    worker_prefetch_count: int = 10
+    # Unacked deliveries per consumer: ~1 for slow real sends, 50-100 for mock mode
+    worker_prefetch_count: int = 50
+    # Apply prefetch to the whole channel instead of per consumer (costlier for the broker)
+    worker_prefetch_global: bool = False
+    # Successful deliveries are acked together (multiple=True) once this many
+    # are pending or after ack_flush_interval seconds, whichever comes first
+    ack_batch_size: int = 50
+    ack_flush_interval: float = 0.05
+    # Failed deliveries wait retry_delay_ms in email.retry before coming back;
+    # after max_retries they are parked in email.failed
+    max_retries: int = 3
+    retry_delay_ms: int = 30000
     
     # Mock Mode
     mock_mode: bool = True
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
 
 
-@lru_cache()
+# Built once at import; hot paths import SETTINGS directly
+SETTINGS: Settings = Settings()
+
+
 def get_settings() -> Settings:
-    return Settings()
+    return SETTINGS
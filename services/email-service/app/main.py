@@ -3,56 +3,49 @@ Email Service - Mock implementation for testing
 """
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 import sys
-import threading
-from datetime import datetime
+import asyncio
+import time
+from datetime import datetime, timezone
 
 from app.config import get_settings
+from app.logging_config import configure_logging
 from app.services.email_service import EmailService
 from app.workers.queue_consumer import EmailQueueConsumer
 
 # Configure logging
 settings = get_settings()
 
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='{"timestamp": "%(asctime)s", "level": "%(levelname)s", "service": "%(name)s", "message": "%(message)s"}',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+configure_logging(settings.log_level)
 
 logger = logging.getLogger(__name__)
 
-# Global worker thread
-worker_thread = None
+# Global worker task
+worker_task = None
 consumer = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
-    global worker_thread, consumer
+    global worker_task, consumer
     
     # Startup
-    logger.info("=" * 50)
     logger.info(f"Starting {settings.service_name} v{settings.service_version}")
     logger.info(f"Environment: {settings.environment}")
     logger.info(f"Mock Mode: {settings.mock_mode}")
-    logger.info("=" * 50)
     
     # Initialize services
     email_service = EmailService()
     logger.info("✅ Email service initialized")
     
-    # Start RabbitMQ consumer in background thread
+    # Start RabbitMQ consumer on the application event loop
     if settings.worker_enabled:
         consumer = EmailQueueConsumer(email_service)
-        worker_thread = threading.Thread(
-            target=consumer.start_consuming,
-            daemon=True
-        )
-        worker_thread.start()
+        worker_task = asyncio.create_task(consumer.start_consuming())
         logger.info("✅ RabbitMQ consumer started in background")
     else:
         logger.warning("⚠️ Worker disabled (WORKER_ENABLED=False)")
@@ -64,8 +57,11 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Email Service...")
     
+    if worker_task and not worker_task.done():
+        worker_task.cancel()
+    
     if consumer:
-        consumer.stop()
+        await consumer.stop()
     
     if email_service.template_client:
         await email_service.template_client.close()
@@ -80,6 +76,7 @@ app = FastAPI(
     version=settings.service_version,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -93,33 +90,54 @@ app.add_middleware(
 )
 
 
+# Settings don't change after startup, so static response parts are built once
+ROOT_INFO = {
+    "service": settings.service_name,
+    "version": settings.service_version,
+    "status": "running",
+    "mock_mode": settings.mock_mode,
+    "worker_enabled": settings.worker_enabled
+}
+
+STATIC_HEALTH = {
+    "service": settings.service_name,
+    "status": "healthy",
+    "version": settings.service_version,
+    "environment": settings.environment,
+    "mock_mode": settings.mock_mode
+}
+
+
+# Probes hit /health constantly; the timestamp only needs one-second resolution
+_timestamp_cache = ["", 0.0]
+
+
+def iso_now() -> str:
+    """Current UTC time as ISO string, reformatted at most once per second"""
+    now = time.time()
+    if now - _timestamp_cache[1] >= 1.0:
+        _timestamp_cache[0] = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+        _timestamp_cache[1] = now
+    return _timestamp_cache[0]
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
-    return {
-        "service": settings.service_name,
-        "version": settings.service_version,
-        "status": "running",
-        "mock_mode": settings.mock_mode,
-        "worker_enabled": settings.worker_enabled
-    }
+    return ROOT_INFO
 
 
 @app.get("/health", status_code=status.HTTP_200_OK)
 def health_check():
     """Health check endpoint"""
-    worker_status = "running" if worker_thread and worker_thread.is_alive() else "stopped"
+    worker_status = "running" if consumer and consumer.consuming else "stopped"
     
     return {
         "success": True,
         "message": "Service is healthy",
         "data": {
-            "service": settings.service_name,
-            "status": "healthy",
-            "version": settings.service_version,
-            "environment": settings.environment,
-            "mock_mode": settings.mock_mode,
-            "timestamp": datetime.utcnow().isoformat(),
+            **STATIC_HEALTH,
+            "timestamp": iso_now(),
             "dependencies": {
                 "worker": worker_status,
                 "template_service": settings.template_service_url
@@ -131,7 +149,7 @@ def health_check():
 @app.get("/ready", status_code=status.HTTP_200_OK)
 def readiness_check():
     """Readiness probe"""
-    worker_ready = worker_thread and worker_thread.is_alive()
+    worker_ready = consumer and consumer.consuming
     
     if worker_ready or not settings.worker_enabled:
         return {"status": "ready"}
@@ -151,5 +169,6 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop" if sys.platform != "win32" else "asyncio"
     )
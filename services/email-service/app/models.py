@@ -1,7 +1,11 @@
 """Pydantic models"""
-from pydantic import BaseModel, EmailStr
+import re
+from pydantic import BaseModel, field_validator
 from typing import Dict, Any, Optional
 
+# Addresses are validated upstream by the gateway; this is only a cheap sanity check
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
 
 class EmailNotificationMessage(BaseModel):
     """Email notification message from queue"""
@@ -10,10 +14,17 @@ class EmailNotificationMessage(BaseModel):
     user_id: str
     template_id: str
     template_data: Dict[str, Any]
-    recipient_email: EmailStr
+    recipient_email: str
     language_code: str = "en"
     priority: str = "normal"
-    retry_count: int = 0
+
+    @field_validator("recipient_email")
+    @classmethod
+    def validate_recipient_email(cls, v):
+        """Reject obviously malformed addresses"""
+        if not _EMAIL_RE.match(v):
+            raise ValueError("recipient_email is not a valid email address")
+        return v
 
 
 class TemplateRenderRequest(BaseModel):
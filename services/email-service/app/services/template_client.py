@@ -1,19 +1,57 @@
 """Template Service HTTP client"""
+import hashlib
 import logging
+import time
 import httpx
-from typing import Dict, Any, Optional
-from app.config import get_settings
+import orjson
+from typing import Dict, Any, Optional, Tuple
+from app.config import SETTINGS
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 
 class TemplateClient:
     """HTTP client for Template Service"""
     
     def __init__(self):
-        self.base_url = settings.template_service_url
-        self.client = httpx.AsyncClient(timeout=10.0)
+        self.base_url = SETTINGS.template_service_url
+        # Pooled keep-alive HTTP/1.1 connections; template-service is plain
+        # http, so there is no TLS to negotiate HTTP/2 over
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0, connect=2.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=100,
+                max_connections=200,
+                keepalive_expiry=60.0
+            )
+        )
+        # (template_id, language_code, data digest) -> (expires_at, rendered)
+        self._cache: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]] = {}
+    
+    @staticmethod
+    def _cache_key(template_id: str, data: Dict[str, Any], language_code: str) -> Tuple[str, str, str]:
+        """Stable key for a render request"""
+        digest = hashlib.blake2b(
+            orjson.dumps(data, option=orjson.OPT_SORT_KEYS),
+            digest_size=16
+        ).hexdigest()
+        return template_id, language_code, digest
+    
+    def _cache_get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, rendered = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        return rendered
+    
+    def _cache_set(self, key: Tuple[str, str, str], rendered: Dict[str, Any]):
+        if len(self._cache) >= SETTINGS.template_cache_max_size:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (time.monotonic() + SETTINGS.template_cache_ttl, rendered)
     
     async def render_template(
         self,
@@ -24,6 +62,8 @@ class TemplateClient:
         """
         Render template via Template Service
         
+        Identical renders within template_cache_ttl are served from memory.
+        
         Args:
             template_id: Template identifier
             data: Data for template rendering
@@ -33,13 +73,19 @@ class TemplateClient:
             Dict with rendered subject and body, or None if failed
         """
         try:
+            cache_key = self._cache_key(template_id, data, language_code)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.debug("Template render cache hit: %s", template_id)
+                return cached
+            
             url = f"{self.base_url}/api/v1/templates/{template_id}/render"
             payload = {
                 "data": data,
                 "language_code": language_code
             }
             
-            logger.info(f"🔄 Rendering template: {template_id}")
+            logger.debug("🔄 Rendering template: %s", template_id)
             
             response = await self.client.post(url, json=payload)
             response.raise_for_status()
@@ -48,17 +94,18 @@ class TemplateClient:
             
             if result.get("success"):
                 rendered_data = result.get("data", {})
-                logger.info(f"✅ Template rendered: {template_id}")
+                self._cache_set(cache_key, rendered_data)
+                logger.debug("✅ Template rendered: %s", template_id)
                 return rendered_data
             else:
-                logger.error(f"❌ Template render failed: {result.get('message')}")
+                logger.error("❌ Template render failed: %s", result.get("message"))
                 return None
                 
         except httpx.HTTPError as e:
-            logger.error(f"❌ HTTP error rendering template: {str(e)}")
+            logger.error("❌ HTTP error rendering template: %s", e)
             return None
         except Exception as e:
-            logger.error(f"❌ Error rendering template: {str(e)}")
+            logger.error("❌ Error rendering template: %s", e)
             return None
     
     async def close(self):
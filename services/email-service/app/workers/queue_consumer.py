@@ -1,148 +1,270 @@
 """RabbitMQ queue consumer for email notifications"""
-import pika
-import json
+import aio_pika
+import orjson
 import logging
 import asyncio
-from typing import Optional
-from app.config import get_settings
+from typing import Dict, Optional
+from pydantic import TypeAdapter
+from app.config import SETTINGS
 from app.models import EmailNotificationMessage
 from app.services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
+
+# Retry topology: rejected messages are dead-lettered to EMAIL_DLX -> email.retry,
+# which dead-letters them back to email.queue once the retry TTL expires
+EMAIL_DLX = "email.dlx"
+RETRY_QUEUE = "email.retry"
+FAILED_QUEUE = "email.failed"
+
+# Built once; validate_python skips the per-call __init__ machinery
+message_adapter = TypeAdapter(EmailNotificationMessage)
 
 
 class EmailQueueConsumer:
-    """RabbitMQ consumer for email.queue"""
-    
+    """
+    RabbitMQ consumer for email.queue
+
+    aio-pika dispatches every delivery to on_message as its own task, so up to
+    prefetch_count renders/sends are in flight at once without explicit batching.
+    """
+
     def __init__(self, email_service: EmailService):
         self.email_service = email_service
-        self.connection: Optional[pika.BlockingConnection] = None
-        self.channel: Optional[pika.channel.Channel] = None
+        self.connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self.channel: Optional[aio_pika.abc.AbstractChannel] = None
+        self.queue: Optional[aio_pika.abc.AbstractQueue] = None
+        self.dlx: Optional[aio_pika.abc.AbstractExchange] = None
+        self.consumer_tag: Optional[str] = None
         self.queue_name = "email.queue"
         self.running = False
-    
-    def connect(self) -> bool:
+
+        # Unsettled deliveries in delivery order: None while still being
+        # processed, the message itself once it is ready to be acked
+        self._unsettled: Dict[int, Optional[aio_pika.abc.AbstractIncomingMessage]] = {}
+        self._pending_count = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def consuming(self) -> bool:
+        """True while the consumer is attached to the queue"""
+        return (
+            self.consumer_tag is not None
+            and self.connection is not None
+            and not self.connection.is_closed
+        )
+
+    async def connect(self) -> bool:
         """Connect to RabbitMQ"""
         try:
-            logger.info(f"Connecting to RabbitMQ: {settings.rabbitmq_url}")
-            
-            parameters = pika.URLParameters(settings.rabbitmq_url)
-            self.connection = pika.BlockingConnection(parameters)
-            self.channel = self.connection.channel()
-            
-            # Declare queue
-            self.channel.queue_declare(
-                queue=self.queue_name,
+            logger.info(f"Connecting to RabbitMQ: {SETTINGS.rabbitmq_url}")
+
+            # Robust connection re-establishes itself (and the consumer) on failure
+            self.connection = await aio_pika.connect_robust(SETTINGS.rabbitmq_url)
+            self.connection.reconnect_callbacks.add(self._on_reconnect)
+            self.channel = await self.connection.channel()
+
+            # Set QoS (per-consumer unless explicitly configured as channel-global)
+            await self.channel.set_qos(
+                prefetch_count=SETTINGS.worker_prefetch_count,
+                global_=SETTINGS.worker_prefetch_global
+            )
+
+            # Dead-letter exchange with delayed retry and parking queues
+            self.dlx = await self.channel.declare_exchange(
+                EMAIL_DLX,
+                aio_pika.ExchangeType.DIRECT,
+                durable=True
+            )
+            retry_queue = await self.channel.declare_queue(
+                RETRY_QUEUE,
+                durable=True,
+                arguments={
+                    'x-message-ttl': SETTINGS.retry_delay_ms,
+                    'x-dead-letter-exchange': '',
+                    'x-dead-letter-routing-key': self.queue_name
+                }
+            )
+            await retry_queue.bind(self.dlx, routing_key='retry')
+            failed_queue = await self.channel.declare_queue(FAILED_QUEUE, durable=True)
+            await failed_queue.bind(self.dlx, routing_key='failed')
+
+            # Declare queue; api-gateway asserts it with the same arguments
+            self.queue = await self.channel.declare_queue(
+                self.queue_name,
                 durable=True,
                 arguments={
                     'x-message-ttl': 86400000,  # 24 hours
-                    'x-max-length': 10000
+                    'x-max-length': 10000,
+                    'x-dead-letter-exchange': EMAIL_DLX,
+                    'x-dead-letter-routing-key': 'retry'
                 }
             )
-            
-            # Set QoS
-            self.channel.basic_qos(prefetch_count=settings.worker_prefetch_count)
-            
+
             logger.info(f"✅ Connected to RabbitMQ queue: {self.queue_name}")
             return True
-            
+
         except Exception as e:
             logger.error(f"❌ Failed to connect to RabbitMQ: {str(e)}")
             return False
-    
-    def callback(self, ch, method, properties, body):
-        """Process message from queue"""
-        try:
-            # Parse message
-            message_data = json.loads(body.decode())
-            message = EmailNotificationMessage(**message_data)
-            
-            logger.info(
-                f"📥 Received email notification: {message.message_id}",
-                extra={
-                    "message_id": message.message_id,
-                    "correlation_id": message.correlation_id,
-                    "user_id": message.user_id,
-                    "template_id": message.template_id
-                }
+
+    # _on_reconnect through _park are duplicated verbatim in email-service's and
+    # push-service's queue_consumer.py (each service is its own Docker build
+    # context, so there is no shared module); change both copies together.
+    def _on_reconnect(self, *args):
+        """Drop ack bookkeeping - delivery tags restart on the new channel"""
+        self._cancel_flush()
+        self._unsettled.clear()
+        self._pending_count = 0
+
+    def _cancel_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(
+                SETTINGS.ack_flush_interval,
+                lambda: asyncio.ensure_future(self._flush_acks())
             )
-            
-            # Process email (async)
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            success = loop.run_until_complete(
-                self.email_service.send_email(
-                    message_id=message.message_id,
+
+    async def _flush_acks(self):
+        """Ack every contiguous completed delivery with a single multiple=True frame"""
+        self._cancel_flush()
+
+        last = None
+        while self._unsettled:
+            tag, ready = next(iter(self._unsettled.items()))
+            if ready is None:
+                # An earlier delivery is still in flight; multiple=True would ack it too
+                break
+            del self._unsettled[tag]
+            self._pending_count -= 1
+            last = ready
+
+        if self._pending_count:
+            self._schedule_flush()
+
+        if last is not None:
+            try:
+                await last.ack(multiple=True)
+            except Exception as e:
+                logger.error("❌ Failed to ack messages: %s", e)
+
+    async def _ack(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """Mark delivery as done; the ack itself is sent in batches"""
+        self._unsettled[message.delivery_tag] = message
+        self._pending_count += 1
+
+        if self._pending_count >= SETTINGS.ack_batch_size:
+            await self._flush_acks()
+        else:
+            self._schedule_flush()
+
+    async def _nack(self, message: aio_pika.abc.AbstractIncomingMessage, requeue: bool):
+        """Reject delivery after flushing acks that precede it"""
+        await self._flush_acks()
+        self._unsettled.pop(message.delivery_tag, None)
+        await message.nack(requeue=requeue)
+
+    def _retry_count(self, message: aio_pika.abc.AbstractIncomingMessage) -> int:
+        """Times the broker has dead-lettered this message out of the consumed queue"""
+        count = 0
+        for death in (message.headers or {}).get("x-death") or ():
+            queue = death.get("queue")
+            if isinstance(queue, bytes):
+                queue = queue.decode()
+            if queue == self.queue_name:
+                count += int(death.get("count", 0))
+        return count
+
+    async def _park(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """Move a message that should not be retried to FAILED_QUEUE"""
+        try:
+            await self.dlx.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    headers=message.headers,
+                    content_type=message.content_type,
                     correlation_id=message.correlation_id,
-                    user_id=message.user_id,
-                    template_id=message.template_id,
-                    template_data=message.template_data,
-                    recipient_email=message.recipient_email,
-                    language_code=message.language_code
-                )
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+                ),
+                routing_key='failed'
             )
-            
-            loop.close()
-            
+        except Exception as e:
+            logger.error("❌ Failed to park message: %s", e)
+            await self._nack(message, requeue=False)
+            return
+        await self._ack(message)
+
+    async def on_message(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """Process message from queue"""
+        # Deliveries are dispatched in order, so this registers tags in order
+        self._unsettled[message.delivery_tag] = None
+
+        try:
+            # Parse message
+            message_data = orjson.loads(message.body)
+            email = message_adapter.validate_python(message_data)
+        except Exception as e:
+            # Malformed messages will never succeed - park them without retrying
+            logger.error("❌ Invalid email notification: %s", e)
+            await self._park(message)
+            return
+
+        try:
+            # send_email logs the one INFO record per email
+            success = await self.email_service.send_email(email)
+
             if success:
                 # Acknowledge message
-                ch.basic_ack(delivery_tag=method.delivery_tag)
-                logger.info(f"✅ Email notification processed: {message.message_id}")
+                await self._ack(message)
             else:
-                # Reject and requeue (up to retry limit)
-                if message.retry_count < 3:
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-                    logger.warning(f"⚠️ Email notification requeued: {message.message_id}")
+                # Reject into the delayed retry queue (up to retry limit)
+                if self._retry_count(message) < SETTINGS.max_retries:
+                    await self._nack(message, requeue=False)
+                    logger.warning("⚠️ Email notification scheduled for retry: %s", email.message_id)
                 else:
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
-                    logger.error(f"❌ Email notification failed permanently: {message.message_id}")
-                    
+                    await self._park(message)
+                    logger.error("❌ Email notification failed permanently: %s", email.message_id)
+
         except Exception as e:
-            logger.error(f"❌ Error processing message: {str(e)}", exc_info=True)
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
-    
-    def start_consuming(self):
-        """Start consuming messages"""
+            logger.error("❌ Error processing message: %s", e, exc_info=True)
+            if self._unsettled.get(message.delivery_tag, False) is None:
+                await self._nack(message, requeue=False)
+
+    async def start_consuming(self):
+        """Connect (retrying until successful) and start consuming messages"""
         self.running = True
-        
-        while self.running:
-            try:
-                if not self.connection or self.connection.is_closed:
-                    if not self.connect():
-                        logger.error("Failed to connect, retrying in 5 seconds...")
-                        import time
-                        time.sleep(5)
-                        continue
-                
-                logger.info(f"👂 Listening for messages on {self.queue_name}...")
-                
-                self.channel.basic_consume(
-                    queue=self.queue_name,
-                    on_message_callback=self.callback,
-                    auto_ack=False
-                )
-                
-                self.channel.start_consuming()
-                
-            except KeyboardInterrupt:
-                logger.info("Stopping consumer...")
-                self.stop()
-                break
-            except Exception as e:
-                logger.error(f"❌ Consumer error: {str(e)}", exc_info=True)
-                import time
-                time.sleep(5)
-    
-    def stop(self):
+
+        while self.running and not await self.connect():
+            logger.error("Failed to connect, retrying in 5 seconds...")
+            await asyncio.sleep(5)
+
+        if not self.running:
+            return
+
+        logger.info(f"👂 Listening for messages on {self.queue_name}...")
+
+        self.consumer_tag = await self.queue.consume(self.on_message)
+
+    async def stop(self):
         """Stop consuming"""
         self.running = False
-        
-        if self.channel and not self.channel.is_closed:
-            self.channel.stop_consuming()
-        
-        if self.connection and not self.connection.is_closed:
-            self.connection.close()
-        
+
+        try:
+            if self.queue and self.consumer_tag:
+                await self.queue.cancel(self.consumer_tag)
+
+            await self._flush_acks()
+
+            if self.connection and not self.connection.is_closed:
+                await self.connection.close()
+        except Exception as e:
+            logger.error(f"Error stopping consumer: {str(e)}")
+        finally:
+            self.consumer_tag = None
+
         logger.info("Consumer stopped")
@@ -1,9 +1,14 @@
-from pydantic_settings import BaseSettings
-from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        frozen=True
+    )
+    
     # Service
     service_name: str = "push-service"
     service_version: str = "1.0.0"
@@ -20,6 +25,11 @@ class Settings(BaseSettings):
     
     # Template Service
     template_service_url: str = "http://template-service:3004"
+    template_cache_ttl: float = 60.0  # seconds to reuse an identical render
+    template_cache_max_size: int = 10000
+    # Render from locally cached template translations, re-fetched after local_template_ttl seconds
+    local_templates_enabled: bool = True
+    local_template_ttl: float = 300.0
     
     # Firebase FCM
     fcm_credentials_path: Optional[str] = None  # Path to service account JSON
@@ -30,13 +40,26 @@ class Settings(BaseSettings):
     
     # Worker
     worker_enabled: bool = True
-    worker_prefetch_count: int = 10
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    # Unacked deliveries per consumer: ~1 for slow real sends, 50-100 for mock mode
+    worker_prefetch_count: int = 50
+    # Apply prefetch to the whole channel instead of per consumer (costlier for the broker)
+    worker_prefetch_global: bool = False
+    # Successful deliveries are acked together (multiple=True) once this many
+    # are pending or after ack_flush_interval seconds, whichever comes first
+    ack_batch_size: int = 64
+    ack_flush_interval: float = 0.05
+    # Failed deliveries wait retry_delay_ms in push.retry, up to max_retries times
+    max_retries: int = 3
+    retry_delay_ms: int = 30000
+    # Upper bound on notifications rendering/sending at once (template-service + FCM)
+    max_concurrent_sends: int = 50
+    # Keep 1 in N per-message INFO lines from the consumer (warnings/errors are never dropped)
+    worker_info_log_sample_every: int = 1
+
+
+# Built once at import; hot paths import SETTINGS directly
+SETTINGS: Settings = Settings()
 
 
-@lru_cache()
 def get_settings() -> Settings:
-    return Settings()
\ No newline at end of file
+    return SETTINGS
@@ -0,0 +1,53 @@
+"""
+Structured JSON logging
+"""
+import itertools
+import logging
+import sys
+import orjson
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RESERVED_LOG_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None))
+) | {"message", "asctime"}
+
+
+class OrjsonFormatter(logging.Formatter):
+    """Emit each record as a single JSON line, including extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": record.created,
+            "level": record.levelname,
+            "service": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_LOG_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(payload, default=str).decode()
+
+
+class InfoSampler(logging.Filter):
+    """Pass one in every `every` INFO-or-lower records; WARNING and above always pass"""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = every
+        self._seen = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or next(self._seen) % self.every == 0
+
+
+def configure_logging(log_level: str) -> None:
+    """Send all records to stdout as JSON lines"""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(OrjsonFormatter())
+
+    logging.basicConfig(
+        level=getattr(logging, log_level),
+        handlers=[handler]
+    )
@@ -4,13 +4,16 @@ Push Service - FastAPI app + RabbitMQ worker
 
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import logging
 import sys
-import threading
-from datetime import datetime
+import asyncio
+import time
+from datetime import datetime, timezone
 
 from app.config import get_settings
+from app.logging_config import configure_logging
 from app.services.notification_service import NotificationService
 from app.workers.queue_consumer import PushQueueConsumer
 from app.utils.response import success_response, error_response
@@ -18,46 +21,48 @@ from app.utils.response import success_response, error_response
 # Configure logging
 settings = get_settings()
 
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='{"timestamp": "%(asctime)s", "level": "%(levelname)s", "service": "%(name)s", "message": "%(message)s"}',
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+configure_logging(settings.log_level)
 
 logger = logging.getLogger(__name__)
 
-# Global worker thread
-worker_thread = None
+# Global worker task
+worker_task = None
 consumer = None
 
+# How often the cached worker status is refreshed for the probes
+WORKER_STATUS_INTERVAL = 1.0
+
+
+async def refresh_worker_status(app: FastAPI):
+    """Keep app.state.worker_alive current so probes don't query the consumer"""
+    while True:
+        app.state.worker_alive = bool(consumer and consumer.consuming)
+        await asyncio.sleep(WORKER_STATUS_INTERVAL)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
-    global worker_thread, consumer
+    global worker_task, consumer
     
     # Startup
-    logger.info("=" * 50)
     logger.info(f"Starting {settings.service_name} v{settings.service_version}")
     logger.info(f"Environment: {settings.environment}")
-    logger.info("=" * 50)
     
     # Initialize services
     notification_service = NotificationService()
     logger.info("✅ Notification service initialized")
     
-    # Start RabbitMQ consumer in background thread
+    # Start RabbitMQ consumer on the application event loop
     if settings.worker_enabled:
         consumer = PushQueueConsumer(notification_service)
-        worker_thread = threading.Thread(
-            target=consumer.start_consuming,
-            daemon=True
-        )
-        worker_thread.start()
+        worker_task = asyncio.create_task(consumer.start_consuming())
         logger.info("✅ RabbitMQ consumer started in background")
     else:
         logger.warning("⚠️ Worker disabled (WORKER_ENABLED=False)")
     
+    status_task = asyncio.create_task(refresh_worker_status(app))
+    
     logger.info(f"🚀 Push Service ready on port {settings.port}")
     
     yield
@@ -65,8 +70,13 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Push Service...")
     
+    status_task.cancel()
+    
+    if worker_task and not worker_task.done():
+        worker_task.cancel()
+    
     if consumer:
-        consumer.stop()
+        await consumer.stop()
     
     if notification_service.template_client:
         await notification_service.template_client.close()
@@ -81,9 +91,12 @@ app = FastAPI(
     version=settings.service_version,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
+app.state.worker_alive = False
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -94,15 +107,41 @@ app.add_middleware(
 )
 
 
+# Settings don't change after startup, so static response parts are built once
+ROOT_INFO = {
+    "service": settings.service_name,
+    "version": settings.service_version,
+    "status": "running",
+    "worker_enabled": settings.worker_enabled
+}
+
+STATIC_HEALTH = {
+    "service": settings.service_name,
+    "status": "healthy",
+    "version": settings.service_version,
+    "environment": settings.environment
+}
+
+FCM_STATUS = "mock_mode" if settings.fcm_credentials_path is None else "configured"
+
+
+# Probes hit /health constantly; the timestamp only needs one-second resolution
+_timestamp_cache = ["", 0.0]
+
+
+def iso_now() -> str:
+    """Current UTC time as ISO string, reformatted at most once per second"""
+    now = time.time()
+    if now - _timestamp_cache[1] >= 1.0:
+        _timestamp_cache[0] = datetime.fromtimestamp(now, timezone.utc).replace(tzinfo=None).isoformat()
+        _timestamp_cache[1] = now
+    return _timestamp_cache[0]
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
-    return {
-        "service": settings.service_name,
-        "version": settings.service_version,
-        "status": "running",
-        "worker_enabled": settings.worker_enabled
-    }
+    return ROOT_INFO
 
 
 @app.get("/health", status_code=status.HTTP_200_OK)
@@ -113,20 +152,14 @@ def health_check():
     Returns service health and dependency status
     """
     # Check worker status
-    worker_status = "running" if worker_thread and worker_thread.is_alive() else "stopped"
-    
-    # Check FCM (mock mode detection)
-    fcm_status = "mock_mode" if settings.fcm_credentials_path is None else "configured"
+    worker_status = "running" if app.state.worker_alive else "stopped"
     
     health_data = {
-        "service": settings.service_name,
-        "status": "healthy",
-        "version": settings.service_version,
-        "environment": settings.environment,
-        "timestamp": datetime.utcnow().isoformat(),
+        **STATIC_HEALTH,
+        "timestamp": iso_now(),
         "dependencies": {
             "worker": worker_status,
-            "fcm": fcm_status,
+            "fcm": FCM_STATUS,
             "template_service": settings.template_service_url
         }
     }
@@ -140,7 +173,7 @@ def health_check():
 @app.get("/ready", status_code=status.HTTP_200_OK)
 def readiness_check():
     """Readiness probe for Kubernetes"""
-    worker_ready = worker_thread and worker_thread.is_alive()
+    worker_ready = app.state.worker_alive
     
     if worker_ready or not settings.worker_enabled:
         return {"status": "ready"}
@@ -163,12 +196,13 @@ def metrics():
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
-# Run with: uvicorn app.main:app --host 0.0.0.0 --port 3003
+# Run with: uvicorn app.main:app --host 0.0.0.0 --port 3003 --loop uvloop
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        loop="uvloop" if sys.platform != "win32" else "asyncio"
     )
\ No newline at end of file
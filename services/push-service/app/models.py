@@ -13,7 +13,6 @@ class PushNotificationRequest(BaseModel):
     device_token: str
     language_code: str = "en"
     priority: str = "normal"  # high, normal
-    retry_count: int = 0
 
 
 class PushNotificationResponse(BaseModel):
@@ -1,11 +1,21 @@
 import firebase_admin
 from firebase_admin import credentials, messaging
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict
+from app.config import SETTINGS
 from app.models import FCMNotification
 
 logger = logging.getLogger(__name__)
 
+# firebase-admin sends are blocking HTTP calls; run them off the event loop.
+# Sized so every prefetched message can have a send in flight.
+_FCM_POOL = ThreadPoolExecutor(
+    max_workers=SETTINGS.worker_prefetch_count,
+    thread_name_prefix="fcm-send"
+)
+
 
 class FCMService:
     """Firebase Cloud Messaging service"""
@@ -84,7 +94,8 @@ class FCMService:
             )
             
             # Send message
-            response = messaging.send(message)
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(_FCM_POOL, messaging.send, message)
             logger.info(f"✅ Push notification sent: {response}")
             return True
         
@@ -107,18 +118,19 @@ class FCMService:
             return {"success": len(device_tokens), "failure": 0}
         
         try:
-            messages = [
-                messaging.Message(
-                    notification=messaging.Notification(
-                        title=notification.title,
-                        body=notification.body
-                    ),
-                    token=token
-                )
-                for token in device_tokens
-            ]
+            # One shared payload for every token instead of a Message per token
+            multicast = messaging.MulticastMessage(
+                notification=messaging.Notification(
+                    title=notification.title,
+                    body=notification.body
+                ),
+                tokens=device_tokens
+            )
             
-            response = messaging.send_all(messages)
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(
+                _FCM_POOL, messaging.send_each_for_multicast, multicast
+            )
             
             return {
                 "success": response.success_count,
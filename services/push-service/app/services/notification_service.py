@@ -1,21 +1,76 @@
+import asyncio
+import hashlib
 import logging
-from typing import Optional
+import orjson
+from cachetools import TTLCache
+from typing import Any, Dict, Optional, Tuple
 from app.models import PushNotificationRequest, PushNotificationResponse, FCMNotification
-from app.services.template_client import TemplateClient
+from app.services.template_client import TemplateClient, normalize_language_code
 from app.services.fcm_service import FCMService
-from app.config import get_settings
+from app.config import SETTINGS
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 
 class NotificationService:
     """Main notification business logic"""
     
     def __init__(self):
-        self.template_client = TemplateClient(settings.template_service_url)
-        self.fcm_service = FCMService(settings.fcm_credentials_path)
+        self.template_client = TemplateClient(SETTINGS.template_service_url)
+        self.fcm_service = FCMService(SETTINGS.fcm_credentials_path)
+        # (template_id, language_code, data digest) -> rendered template
+        self._render_cache: TTLCache = TTLCache(
+            maxsize=SETTINGS.template_cache_max_size,
+            ttl=SETTINGS.template_cache_ttl
+        )
+        # Renders currently in flight, so concurrent misses share one request
+        self._render_inflight: Dict[Tuple[str, str, bytes], asyncio.Future] = {}
+        # Caps in-flight sends regardless of how many deliveries are prefetched
+        self._send_slots = asyncio.Semaphore(SETTINGS.max_concurrent_sends)
+    
+    async def _render(self, request: PushNotificationRequest) -> Optional[Dict[str, Any]]:
+        """Render via template-service, reusing identical renders within the cache TTL"""
+        key = (
+            request.template_id,
+            normalize_language_code(request.language_code),
+            hashlib.blake2b(
+                orjson.dumps(request.template_data, option=orjson.OPT_SORT_KEYS),
+                digest_size=16
+            ).digest()
+        )
+        
+        rendered = self._render_cache.get(key)
+        if rendered is not None:
+            return rendered
+        
+        inflight = self._render_inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._render_inflight[key] = future
+        try:
+            rendered = await self.template_client.render_template(
+                template_id=request.template_id,
+                data=request.template_data,
+                language_code=request.language_code,
+                correlation_id=request.correlation_id
+            )
+            if rendered:
+                self._render_cache[key] = rendered
+            future.set_result(rendered)
+            return rendered
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters see the error; don't warn about it being unretrieved here
+            future.exception()
+            raise
+        finally:
+            del self._render_inflight[key]
     
     async def send_notification(
         self,
@@ -28,14 +83,13 @@ class NotificationService:
         2. Send via FCM
         3. Return result
         """
+        async with self._send_slots:
+            return await self._send(request)
+    
+    async def _send(self, request: PushNotificationRequest) -> PushNotificationResponse:
         try:
             # Step 1: Render template
-            rendered = await self.template_client.render_template(
-                template_id=request.template_id,
-                data=request.template_data,
-                language_code=request.language_code,
-                correlation_id=request.correlation_id
-            )
+            rendered = await self._render(request)
             
             if not rendered:
                 logger.error(f"Failed to render template {request.template_id}")
@@ -1,17 +1,98 @@
 import httpx
-from typing import Dict, Any, Optional
+import orjson
+import time
+from jinja2 import StrictUndefined, Template, TemplateError, UndefinedError
+from jinja2.sandbox import ImmutableSandboxedEnvironment
+from typing import Dict, Any, Optional, Tuple
 import logging
+from app.config import SETTINGS
 
 logger = logging.getLogger(__name__)
 
+# language_code -> (subject, body) compiled templates
+CompiledTranslations = Dict[str, Tuple[Optional[Template], Template]]
+
+
+def normalize_language_code(language_code: str) -> str:
+    """Same normalization template-service applies before picking a translation"""
+    return language_code.strip().lower()
+
 
 class TemplateClient:
     """Client for Template Service"""
-    
+
     def __init__(self, base_url: str):
-        self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=10.0)
-    
+        self.base_url = base_url.rstrip("/")
+        # One pooled client per process; concurrent renders reuse keep-alive
+        # HTTP/1.1 connections to template-service
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(connect=2.0, read=5.0, write=5.0, pool=1.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=30.0
+            )
+        )
+
+        # Same rendering options as template-service's TemplateRenderer, sandboxed
+        # because template bodies come from another service
+        self._env = ImmutableSandboxedEnvironment(
+            autoescape=False,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            undefined=StrictUndefined
+        )
+        # template_id -> (expires_at, compiled translations or None if unavailable)
+        self._local: Dict[str, Tuple[float, Optional[CompiledTranslations]]] = {}
+        self._local_enabled = SETTINGS.local_templates_enabled
+        self._local_ttl = SETTINGS.local_template_ttl
+
+    async def _fetch_translations(
+        self,
+        template_id: str,
+        correlation_id: Optional[str]
+    ) -> Optional[CompiledTranslations]:
+        """Pull a template's active translations and compile them"""
+        headers = {"X-Correlation-ID": correlation_id} if correlation_id else None
+
+        try:
+            response = await self.client.get(f"/api/v1/templates/{template_id}", headers=headers)
+            if response.status_code != 200:
+                return None
+
+            result = orjson.loads(response.content)
+            if not result["success"]:
+                return None
+
+            return {
+                translation["language_code"]: (
+                    self._env.from_string(translation["subject"]) if translation.get("subject") else None,
+                    self._env.from_string(translation["body"])
+                )
+                for translation in result["data"].get("translations", [])
+                if translation.get("is_active", True)
+            } or None
+
+        except Exception as e:
+            logger.warning(f"Could not load template {template_id} for local rendering: {str(e)}")
+            return None
+
+    async def _local_translations(
+        self,
+        template_id: str,
+        correlation_id: Optional[str]
+    ) -> Optional[CompiledTranslations]:
+        """Compiled translations for template_id, refreshed every local_template_ttl seconds"""
+        now = time.monotonic()
+        entry = self._local.get(template_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        translations = await self._fetch_translations(template_id, correlation_id)
+        self._local[template_id] = (now + self._local_ttl, translations)
+        return translations
+
     async def render_template(
         self,
         template_id: str,
@@ -19,32 +100,66 @@ class TemplateClient:
         language_code: str = "en",
         correlation_id: Optional[str] = None
     ) -> Optional[Dict[str, str]]:
-        """Render template"""
-        headers = {}
+        """
+        Render template
+
+        Templates are rendered in-process from locally cached translations when
+        possible; otherwise the render is delegated to template-service.
+        """
+        if self._local_enabled:
+            translations = await self._local_translations(template_id, correlation_id)
+            compiled = translations and (
+                translations.get(normalize_language_code(language_code)) or translations.get("en")
+            )
+            if compiled:
+                subject, body = compiled
+                try:
+                    return {
+                        "subject": subject.render(**data) if subject else None,
+                        "body": body.render(**data)
+                    }
+                except UndefinedError as e:
+                    # Same outcome as template-service's MISSING_VARIABLES response
+                    logger.error(f"Template render failed: {str(e)}")
+                    return None
+                except TemplateError as e:
+                    logger.warning(f"Local render of {template_id} failed, using template-service: {str(e)}")
+
+        return await self._render_remote(template_id, data, language_code, correlation_id)
+
+    async def _render_remote(
+        self,
+        template_id: str,
+        data: Dict[str, Any],
+        language_code: str,
+        correlation_id: Optional[str]
+    ) -> Optional[Dict[str, str]]:
+        """Render via template-service"""
+        headers = {"Content-Type": "application/json"}
         if correlation_id:
             headers["X-Correlation-ID"] = correlation_id
-        
+
         try:
             response = await self.client.post(
-                f"{self.base_url}/api/v1/templates/{template_id}/render",
-                json={
+                f"/api/v1/templates/{template_id}/render",
+                content=orjson.dumps({
                     "data": data,
                     "language_code": language_code
-                },
+                }),
                 headers=headers
             )
-            
+
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 if result["success"]:
                     return result["data"]
-            
+
             logger.error(f"Template render failed: {response.text}")
             return None
-        
+
         except Exception as e:
             logger.error(f"Error rendering template: {str(e)}")
             return None
-    
+
     async def close(self):
-        await self.client.aclose()
\ No newline at end of file
+        await self.client.aclose()
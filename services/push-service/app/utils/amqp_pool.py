@@ -0,0 +1,42 @@
+"""Pooled AMQP connections and channels for publishers"""
+
+import aio_pika
+from aio_pika.pool import Pool
+
+
+class ChannelPool:
+    """
+    Reuses a few robust connections and a bounded set of channels across publishes
+
+    Publishers hold a channel only for the duration of `async with pool.acquire()`,
+    so thousands of publishes share the same TCP + AMQP sessions instead of
+    handshaking per message.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 2,
+        max_channels: int = 10,
+        publisher_confirms: bool = True
+    ):
+        self.url = url
+        self.publisher_confirms = publisher_confirms
+        self.connections: Pool = Pool(self._get_connection, max_size=max_connections)
+        self.channels: Pool = Pool(self._get_channel, max_size=max_channels)
+
+    async def _get_connection(self) -> aio_pika.abc.AbstractRobustConnection:
+        return await aio_pika.connect_robust(self.url)
+
+    async def _get_channel(self) -> aio_pika.abc.AbstractChannel:
+        async with self.connections.acquire() as connection:
+            return await connection.channel(publisher_confirms=self.publisher_confirms)
+
+    def acquire(self):
+        """Borrow a channel: `async with pool.acquire() as channel: ...`"""
+        return self.channels.acquire()
+
+    async def close(self):
+        """Close all pooled channels, then their connections"""
+        await self.channels.close()
+        await self.connections.close()
@@ -2,6 +2,26 @@
 
 from typing import Optional, Any
 
+# Meta only depends on whether data is present, so both variants are shared.
+# Plain dicts (not MappingProxyType) because orjson can't serialise proxies;
+# treat them as read-only.
+_EMPTY_META = {
+    "total": 0,
+    "limit": 10,
+    "page": 1,
+    "total_pages": 0,
+    "has_next": False,
+    "has_previous": False
+}
+_SINGLE_META = {
+    "total": 1,
+    "limit": 10,
+    "page": 1,
+    "total_pages": 1,
+    "has_next": False,
+    "has_previous": False
+}
+
 
 def create_response(
     success: bool,
@@ -15,14 +35,7 @@ def create_response(
         "data": data,
         "error": error,
         "message": message,
-        "meta": {
-            "total": 1 if data else 0,
-            "limit": 10,
-            "page": 1,
-            "total_pages": 1 if data else 0,
-            "has_next": False,
-            "has_previous": False
-        }
+        "meta": _SINGLE_META if data else _EMPTY_META
     }
 
 
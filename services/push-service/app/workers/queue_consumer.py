@@ -1,136 +1,287 @@
-import pika
-import json
+import aio_pika
 import logging
 import asyncio
-from typing import Callable
-from app.config import get_settings
+from typing import Dict, Optional
+from pydantic import TypeAdapter, ValidationError
+from app.config import SETTINGS
+from app.logging_config import InfoSampler
 from app.models import PushNotificationRequest
 from app.services.notification_service import NotificationService
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
+if SETTINGS.worker_info_log_sample_every > 1:
+    logger.addFilter(InfoSampler(SETTINGS.worker_info_log_sample_every))
+
+# Retry topology: rejected messages are dead-lettered to PUSH_DLX -> push.retry,
+# which dead-letters them back to push.queue once the retry TTL expires
+PUSH_DLX = "push.dlx"
+RETRY_QUEUE = "push.retry"
+FAILED_QUEUE = "push.failed"
+
+# Built once; validate_json decodes the delivery body straight into the model in a
+# single Rust pass (no json.loads dict), so message models stay pydantic like the
+# rest of the service instead of switching to msgspec structs
+request_adapter = TypeAdapter(PushNotificationRequest)
 
 
 class PushQueueConsumer:
-    """Consumes messages from push.queue"""
-    
+    """
+    Consumes messages from push.queue
+
+    Runs on the application's event loop; aio-pika dispatches each delivery to
+    on_message as its own task, so up to prefetch_count notifications are in
+    flight at once.
+    """
+
     def __init__(self, notification_service: NotificationService):
         self.notification_service = notification_service
-        self.connection = None
-        self.channel = None
-        self.consuming = False
-    
-    def connect(self) -> bool:
+        self.connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self.channel: Optional[aio_pika.abc.AbstractChannel] = None
+        self.queue: Optional[aio_pika.abc.AbstractQueue] = None
+        self.dlx: Optional[aio_pika.abc.AbstractExchange] = None
+        self.consumer_tag: Optional[str] = None
+        self.running = False
+
+        self.queue_name = SETTINGS.push_queue_name
+        # Resolved once; per-delivery code reads these instead of SETTINGS
+        self._prefetch = SETTINGS.worker_prefetch_count
+        self._max_retries = SETTINGS.max_retries
+
+        # Unsettled deliveries in delivery order: None while still being
+        # processed, the message itself once it is ready to be acked
+        self._unsettled: Dict[int, Optional[aio_pika.abc.AbstractIncomingMessage]] = {}
+        self._pending_count = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def consuming(self) -> bool:
+        """True while the consumer is attached to the queue"""
+        return (
+            self.consumer_tag is not None
+            and self.connection is not None
+            and not self.connection.is_closed
+        )
+
+    async def connect(self) -> bool:
         """Connect to RabbitMQ"""
         try:
             logger.info("Connecting to RabbitMQ...")
-            
-            parameters = pika.URLParameters(settings.rabbitmq_url)
-            parameters.heartbeat = 600
-            
-            self.connection = pika.BlockingConnection(parameters)
-            self.channel = self.connection.channel()
-            
-            # Declare queue with DLQ
-            self.channel.queue_declare(
-                queue=settings.push_queue_name,
+
+            # Robust connection re-establishes itself (and the consumer) on failure
+            self.connection = await aio_pika.connect_robust(SETTINGS.rabbitmq_url)
+            self.connection.reconnect_callbacks.add(self._on_reconnect)
+            self.channel = await self.connection.channel()
+
+            await self.channel.set_qos(
+                prefetch_count=self._prefetch,
+                global_=SETTINGS.worker_prefetch_global
+            )
+
+            # Dead-letter exchange with delayed retry and parking queues
+            self.dlx = await self.channel.declare_exchange(
+                PUSH_DLX,
+                aio_pika.ExchangeType.DIRECT,
+                durable=True
+            )
+            retry_queue = await self.channel.declare_queue(
+                RETRY_QUEUE,
+                durable=True,
+                arguments={
+                    'x-message-ttl': SETTINGS.retry_delay_ms,
+                    'x-dead-letter-exchange': '',
+                    'x-dead-letter-routing-key': self.queue_name
+                }
+            )
+            await retry_queue.bind(self.dlx, routing_key='retry')
+            failed_queue = await self.channel.declare_queue(FAILED_QUEUE, durable=True)
+            await failed_queue.bind(self.dlx, routing_key='failed')
+
+            # Declare queue; rejected deliveries go to the retry queue. api-gateway
+            # asserts it with the same arguments
+            self.queue = await self.channel.declare_queue(
+                self.queue_name,
                 durable=True,
                 arguments={
-                    'x-dead-letter-exchange': 'notifications.dlx',
-                    'x-dead-letter-routing-key': 'failed'
+                    'x-dead-letter-exchange': PUSH_DLX,
+                    'x-dead-letter-routing-key': 'retry'
                 }
             )
-            
+
             logger.info(f"✅ Connected to RabbitMQ")
-            logger.info(f"✅ Queue '{settings.push_queue_name}' ready")
-            
+            logger.info(f"✅ Queue '{self.queue_name}' ready")
+
             return True
-        
+
         except Exception as e:
             logger.error(f"❌ Failed to connect to RabbitMQ: {str(e)}")
             return False
-    
-    def callback(self, ch, method, properties, body):
-        """Process incoming messages"""
-        try:
-            # Parse message
-            message = json.loads(body)
-            correlation_id = properties.correlation_id or 'unknown'
-            
-            logger.info(
-                f"📥 Received push notification request",
-                extra={'correlation_id': correlation_id}
+
+    # _on_reconnect through _park are duplicated verbatim in email-service's and
+    # push-service's queue_consumer.py (each service is its own Docker build
+    # context, so there is no shared module); change both copies together.
+    def _on_reconnect(self, *args):
+        """Drop ack bookkeeping - delivery tags restart on the new channel"""
+        self._cancel_flush()
+        self._unsettled.clear()
+        self._pending_count = 0
+
+    def _cancel_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(
+                SETTINGS.ack_flush_interval,
+                lambda: asyncio.ensure_future(self._flush_acks())
             )
-            
-            # Convert to model
-            request = PushNotificationRequest(**message)
-            
-            # Process notification (async)
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.notification_service.send_notification(request)
+
+    async def _flush_acks(self):
+        """Ack every contiguous completed delivery with a single multiple=True frame"""
+        self._cancel_flush()
+
+        last = None
+        while self._unsettled:
+            tag, ready = next(iter(self._unsettled.items()))
+            if ready is None:
+                # An earlier delivery is still in flight; multiple=True would ack it too
+                break
+            del self._unsettled[tag]
+            self._pending_count -= 1
+            last = ready
+
+        if self._pending_count:
+            self._schedule_flush()
+
+        if last is not None:
+            try:
+                await last.ack(multiple=True)
+            except Exception as e:
+                logger.error("❌ Failed to ack messages: %s", e)
+
+    async def _ack(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """Mark delivery as done; the ack itself is sent in batches"""
+        self._unsettled[message.delivery_tag] = message
+        self._pending_count += 1
+
+        if self._pending_count >= SETTINGS.ack_batch_size:
+            await self._flush_acks()
+        else:
+            self._schedule_flush()
+
+    async def _nack(self, message: aio_pika.abc.AbstractIncomingMessage, requeue: bool):
+        """Reject delivery after flushing acks that precede it"""
+        await self._flush_acks()
+        self._unsettled.pop(message.delivery_tag, None)
+        await message.nack(requeue=requeue)
+
+    def _retry_count(self, message: aio_pika.abc.AbstractIncomingMessage) -> int:
+        """Times the broker has dead-lettered this message out of the consumed queue"""
+        count = 0
+        for death in (message.headers or {}).get("x-death") or ():
+            queue = death.get("queue")
+            if isinstance(queue, bytes):
+                queue = queue.decode()
+            if queue == self.queue_name:
+                count += int(death.get("count", 0))
+        return count
+
+    async def _park(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """Move a message that should not be retried to FAILED_QUEUE"""
+        try:
+            await self.dlx.publish(
+                aio_pika.Message(
+                    body=message.body,
+                    headers=message.headers,
+                    content_type=message.content_type,
+                    correlation_id=message.correlation_id,
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+                ),
+                routing_key='failed'
             )
-            loop.close()
-            
+        except Exception as e:
+            logger.error("❌ Failed to park message: %s", e)
+            await self._nack(message, requeue=False)
+            return
+        await self._ack(message)
+
+    async def on_message(self, message: aio_pika.abc.AbstractIncomingMessage):
+        """Process incoming messages"""
+        # Deliveries are dispatched in order, so this registers tags in order
+        self._unsettled[message.delivery_tag] = None
+
+        # One adapter per delivery carries correlation_id on every line
+        log = logging.LoggerAdapter(
+            logger,
+            {'correlation_id': message.correlation_id or 'unknown'}
+        )
+
+        try:
+            log.info("📥 Received push notification request")
+
+            # Parse and validate in one pass
+            request = request_adapter.validate_json(message.body)
+
+            result = await self.notification_service.send_notification(request)
+
             if result.success:
                 # Acknowledge message
-                ch.basic_ack(delivery_tag=method.delivery_tag)
-                logger.info(f"✅ Push notification sent to user {request.user_id}")
+                await self._ack(message)
+                log.info("✅ Push notification sent to user %s", request.user_id)
             else:
-                # Retry or send to DLQ
-                if request.retry_count < 3:
-                    # Requeue for retry
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-                    logger.warning(f"⚠️ Requeuing message (retry {request.retry_count + 1})")
+                # Reject into the delayed retry queue (up to retry limit), then park
+                retries = self._retry_count(message)
+                if retries < self._max_retries:
+                    await self._nack(message, requeue=False)
+                    log.warning("⚠️ Push notification scheduled for retry %d", retries + 1)
                 else:
-                    # Send to DLQ
-                    ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
-                    logger.error(f"❌ Message sent to DLQ after 3 retries")
-        
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON: {str(e)}")
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
-        
+                    await self._park(message)
+                    log.error("❌ Push notification parked after %d retries", retries)
+
+        except ValidationError as e:
+            # Covers malformed JSON too; retrying will never succeed
+            log.error("Invalid message: %s", e)
+            await self._park(message)
+
         except Exception as e:
-            logger.error(f"Error processing message: {str(e)}", exc_info=True)
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-    
-    def start_consuming(self):
-        """Start consuming messages"""
-        if not self.connect():
-            raise Exception("Failed to connect to RabbitMQ")
-        
-        try:
-            self.channel.basic_qos(prefetch_count=settings.worker_prefetch_count)
-            self.channel.basic_consume(
-                queue=settings.push_queue_name,
-                on_message_callback=self.callback
-            )
-            
-            logger.info("🎧 Started consuming push notifications...")
-            logger.info("Press Ctrl+C to stop")
-            
-            self.consuming = True
-            self.channel.start_consuming()
-        
-        except KeyboardInterrupt:
-            logger.info("Stopping consumer...")
-            self.stop()
-    
-    def stop(self):
-        """Stop consuming"""
+            log.error("Error processing message: %s", e, exc_info=True)
+            if self._unsettled.get(message.delivery_tag, False) is None:
+                await self._nack(message, requeue=False)
+
+    async def start_consuming(self):
+        """Connect (retrying until successful) and start consuming messages"""
+        self.running = True
+
+        while self.running and not await self.connect():
+            logger.error("Failed to connect, retrying in 5 seconds...")
+            await asyncio.sleep(5)
+
+        if not self.running:
+            return
+
+        self.consumer_tag = await self.queue.consume(self.on_message)
+        logger.info("🎧 Started consuming push notifications...")
+
+    async def stop(self):
+        """Cancel the consumer and close the connection"""
         logger.info("Stopping queue consumer...")
-        
+        self.running = False
+
         try:
-            if self.channel and self.channel.is_open:
-                self.channel.stop_consuming()
-                self.channel.close()
-            
-            if self.connection and self.connection.is_open:
-                self.connection.close()
-            
+            if self.queue and self.consumer_tag:
+                await self.queue.cancel(self.consumer_tag)
+
+            await self._flush_acks()
+
+            if self.connection and not self.connection.is_closed:
+                await self.connection.close()
+
             logger.info("✅ Consumer stopped gracefully")
-        
+
         except Exception as e:
-            logger.error(f"Error stopping consumer: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error stopping consumer: {str(e)}")
+
+        finally:
+            self.consumer_tag = None
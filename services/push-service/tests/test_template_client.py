@@ -0,0 +1,42 @@
+"""
+Tests for the template-service client
+"""
+
+import asyncio
+import time
+
+import pytest
+from app.services.template_client import TemplateClient, normalize_language_code
+
+
+@pytest.fixture
+def client():
+    """Client with local rendering on and an English and Spanish translation cached"""
+    template_client = TemplateClient("http://template-service:3004")
+    template_client._local_enabled = True
+    env = template_client._env
+    template_client._local["welcome"] = (time.monotonic() + 60, {
+        "en": (None, env.from_string("Hello {{ name }}")),
+        "es": (None, env.from_string("Hola {{ name }}")),
+    })
+    return template_client
+
+
+@pytest.mark.parametrize("language_code", ["es", "ES", " es ", "Es"])
+def test_local_render_normalizes_language_code(client, language_code):
+    """Mixed-case or padded codes pick the same translation template-service would"""
+    rendered = asyncio.run(client.render_template("welcome", {"name": "Ana"}, language_code))
+
+    assert rendered == {"subject": None, "body": "Hola Ana"}
+
+
+def test_local_render_falls_back_to_english(client):
+    """Unknown languages fall back to 'en', like template-service"""
+    rendered = asyncio.run(client.render_template("welcome", {"name": "Ana"}, "fr"))
+
+    assert rendered["body"] == "Hello Ana"
+
+
+def test_normalize_language_code():
+    """Matches template-service's strip().lower()"""
+    assert normalize_language_code(" PT-BR ") == "pt-br"
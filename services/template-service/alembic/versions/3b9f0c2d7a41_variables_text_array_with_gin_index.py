@@ -0,0 +1,44 @@
+"""variables_text_array_with_gin_index
+
+Revision ID: 3b9f0c2d7a41
+Revises: ec680b5082f3
+Create Date: 2026-10-15 23:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9f0c2d7a41'
+down_revision = 'ec680b5082f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ALTER ... USING can't take a subquery, so the JSON array is copied into a
+    # new text[] column and swapped in. Rewrites template_versions under an
+    # ACCESS EXCLUSIVE lock; run it in a quiet window.
+    op.execute("ALTER TABLE template_versions ADD COLUMN variables_array varchar[]")
+    op.execute("""
+        UPDATE template_versions
+        SET variables_array = ARRAY(SELECT json_array_elements_text(variables::json))
+    """)
+    op.execute("ALTER TABLE template_versions ALTER COLUMN variables_array SET NOT NULL")
+    op.execute("ALTER TABLE template_versions DROP COLUMN variables")
+    op.execute("ALTER TABLE template_versions RENAME COLUMN variables_array TO variables")
+
+    # Set-containment lookups ("versions using variable x") become index scans
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_template_versions_variables_gin
+            ON template_versions USING gin (variables)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_template_versions_variables_gin")
+
+    op.execute("ALTER TABLE template_versions ALTER COLUMN variables TYPE json USING to_json(variables)")
@@ -17,26 +17,37 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Drop the old unique index
-    op.drop_index('ix_templates_template_id', table_name='templates')
-    
-    # Create a partial unique index (only for active templates)
-    op.execute("""
-        CREATE UNIQUE INDEX ix_templates_template_id_active 
-        ON templates (template_id) 
-        WHERE is_active = true
-    """)
-    
-    # Recreate a non-unique index for all templates (for lookups)
-    op.create_index('ix_templates_template_id', 'templates', ['template_id'], unique=False)
+    # CONCURRENTLY builds don't block writes to templates, but can't run inside
+    # a transaction, so these statements run in autocommit mode
+    with op.get_context().autocommit_block():
+        # Create the partial unique index (only for active templates) first, so
+        # lookups stay indexed while the old index is swapped out
+        op.execute("""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_templates_template_id_active
+            ON templates (template_id)
+            WHERE is_active = true
+        """)
+        
+        # Drop the old unique index
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_templates_template_id")
+        
+        # Recreate a non-unique index for all templates (for lookups)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_templates_template_id
+            ON templates (template_id)
+        """)
 
 
 def downgrade() -> None:
-    # Drop the non-unique index
-    op.drop_index('ix_templates_template_id', table_name='templates')
-    
-    # Drop the partial unique index
-    op.drop_index('ix_templates_template_id_active', table_name='templates')
-    
-    # Recreate the old unique index
-    op.create_index('ix_templates_template_id', 'templates', ['template_id'], unique=True)
+    with op.get_context().autocommit_block():
+        # Drop the non-unique index
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_templates_template_id")
+        
+        # Recreate the old unique index
+        op.execute("""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_templates_template_id
+            ON templates (template_id)
+        """)
+        
+        # Drop the partial unique index
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_templates_template_id_active")
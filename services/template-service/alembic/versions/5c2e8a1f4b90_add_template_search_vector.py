@@ -0,0 +1,42 @@
+"""add_template_search_vector
+
+Revision ID: 5c2e8a1f4b90
+Revises: 3b9f0c2d7a41
+Create Date: 2026-10-15 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8a1f4b90'
+down_revision = '3b9f0c2d7a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Full-text document for list_templates' multi-word search. Not mapped on
+    # the model; queried by name so other databases never see it. Adding a
+    # STORED generated column rewrites the table.
+    op.execute("""
+        ALTER TABLE templates ADD COLUMN IF NOT EXISTS search_vec tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('simple',
+                coalesce(name, '') || ' ' || coalesce(description, '') || ' ' || template_id)
+        ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_templates_search_vec
+            ON templates USING gin (search_vec)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_templates_search_vec")
+
+    op.execute("ALTER TABLE templates DROP COLUMN IF EXISTS search_vec")
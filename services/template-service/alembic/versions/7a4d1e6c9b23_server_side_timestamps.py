@@ -0,0 +1,45 @@
+"""server_side_timestamps
+
+Revision ID: 7a4d1e6c9b23
+Revises: 5c2e8a1f4b90
+Create Date: 2026-10-15 23:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4d1e6c9b23'
+down_revision = '5c2e8a1f4b90'
+branch_labels = None
+depends_on = None
+
+# (table, timestamp columns) now defaulted by the database
+TIMESTAMP_COLUMNS = (
+    ("templates", ("created_at", "updated_at")),
+    ("template_versions", ("created_at",)),
+    ("template_translations", ("created_at", "updated_at")),
+)
+
+
+def upgrade() -> None:
+    # Existing values were written as UTC into timestamp-without-time-zone.
+    # Changing the type rewrites each table under an ACCESS EXCLUSIVE lock.
+    for table, columns in TIMESTAMP_COLUMNS:
+        for column in columns:
+            op.execute(f"""
+                ALTER TABLE {table}
+                    ALTER COLUMN {column} TYPE timestamptz USING {column} AT TIME ZONE 'UTC',
+                    ALTER COLUMN {column} SET DEFAULT now()
+            """)
+
+
+def downgrade() -> None:
+    for table, columns in TIMESTAMP_COLUMNS:
+        for column in columns:
+            op.execute(f"""
+                ALTER TABLE {table}
+                    ALTER COLUMN {column} DROP DEFAULT,
+                    ALTER COLUMN {column} TYPE timestamp USING {column} AT TIME ZONE 'UTC'
+            """)
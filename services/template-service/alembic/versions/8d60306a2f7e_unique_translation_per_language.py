@@ -0,0 +1,31 @@
+"""unique_translation_per_language
+
+Revision ID: 8d60306a2f7e
+Revises: e698373dbd42
+Create Date: 2026-10-15 22:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d60306a2f7e'
+down_revision = 'e698373dbd42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Conflict target for add_translation's INSERT ... ON CONFLICT. Fails if a
+    # template already has two rows for one language; remove the older row first.
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_template_translations_template_language
+            ON template_translations (template_id, language_code)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_template_translations_template_language")
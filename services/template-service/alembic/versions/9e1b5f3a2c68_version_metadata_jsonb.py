@@ -0,0 +1,42 @@
+"""version_metadata_jsonb
+
+Revision ID: 9e1b5f3a2c68
+Revises: 7a4d1e6c9b23
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e1b5f3a2c68'
+down_revision = '7a4d1e6c9b23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rewrites template_versions under an ACCESS EXCLUSIVE lock
+    op.execute("""
+        ALTER TABLE template_versions
+        ALTER COLUMN template_metadata TYPE jsonb USING template_metadata::jsonb
+    """)
+
+    # Only containment (@>) lookups are needed, so the smaller jsonb_path_ops
+    # operator class is enough
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_template_versions_metadata_gin
+            ON template_versions USING gin (template_metadata jsonb_path_ops)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_template_versions_metadata_gin")
+
+    op.execute("""
+        ALTER TABLE template_versions
+        ALTER COLUMN template_metadata TYPE json USING template_metadata::json
+    """)
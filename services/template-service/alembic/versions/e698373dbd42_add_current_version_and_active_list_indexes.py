@@ -0,0 +1,43 @@
+"""add_current_version_and_active_list_indexes
+
+Revision ID: e698373dbd42
+Revises: 421a1efdc678
+Create Date: 2026-10-15 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e698373dbd42'
+down_revision = '421a1efdc678'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY so writes aren't blocked; that can't run inside a
+    # transaction, so these statements run in autocommit mode
+    with op.get_context().autocommit_block():
+        # One current version per template: current-version lookups become a
+        # single index probe. Fails if a template already has two current
+        # versions; fix those rows first.
+        op.execute("""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_template_versions_current
+            ON template_versions (template_id)
+            WHERE is_current = true
+        """)
+
+        # Active templates newest first, matching list_templates' filter and sort
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_templates_active_created_at
+            ON templates (created_at DESC)
+            WHERE is_active = true
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_templates_active_created_at")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_template_versions_current")
@@ -0,0 +1,39 @@
+"""add_trigram_search_indexes
+
+Revision ID: ec680b5082f3
+Revises: 8d60306a2f7e
+Create Date: 2026-10-15 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ec680b5082f3'
+down_revision = '8d60306a2f7e'
+branch_labels = None
+depends_on = None
+
+# list_templates' search does ILIKE '%term%' on these columns; trigram GIN
+# indexes let the planner use an index for unanchored patterns
+SEARCH_COLUMNS = ("template_id", "name", "description")
+
+
+def upgrade() -> None:
+    # Needs a role allowed to create extensions (or pg_trgm preinstalled)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.execute(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_templates_{column}_trgm
+                ON templates USING gin ({column} gin_trgm_ops)
+            """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_templates_{column}_trgm")
+    # pg_trgm is left installed; other objects may depend on it
@@ -19,6 +19,33 @@ router = APIRouter(tags=["Health"])
 start_time = time.time()
 settings = get_settings()
 
+# System stats are sampled at most once per SYSTEM_STATS_TTL seconds
+SYSTEM_STATS_TTL = 1.0
+_system_stats = {"expires_at": 0.0, "data": {}}
+
+# Prime the CPU counter so later non-blocking calls report usage since the last call
+psutil.cpu_percent(interval=None)
+
+
+def get_system_stats() -> dict:
+    """Memory/CPU/disk usage without blocking the request thread"""
+    now = time.monotonic()
+    if now >= _system_stats["expires_at"]:
+        _system_stats["data"] = {
+            "memory_usage_percent": psutil.virtual_memory().percent,
+            "cpu_usage_percent": psutil.cpu_percent(interval=None),
+            "disk_usage_percent": psutil.disk_usage('/').percent,
+            "process_id": os.getpid()
+        }
+        _system_stats["expires_at"] = now + SYSTEM_STATS_TTL
+    return _system_stats["data"]
+
+
+# Readiness result is reused for READY_CACHE_TTL seconds so frequent probes
+# don't each take a pooled connection for SELECT 1
+READY_CACHE_TTL = 2.0
+_ready_cache = {"checked_at": float("-inf"), "error": None}
+
 
 @router.get("/health", status_code=status.HTTP_200_OK)
 def health_check(db: Session = Depends(get_db)):
@@ -40,11 +67,6 @@ def health_check(db: Session = Depends(get_db)):
     # Calculate uptime
     uptime_seconds = int(time.time() - start_time)
     
-    # Get system metrics
-    memory_usage = psutil.virtual_memory().percent
-    cpu_usage = psutil.cpu_percent(interval=0.1)
-    disk_usage = psutil.disk_usage('/').percent
-    
     health_data = {
         "service": settings.service_name,
         "status": "healthy" if db_status == "healthy" else "degraded",
@@ -58,12 +80,7 @@ def health_check(db: Session = Depends(get_db)):
                 "error": db_error
             }
         },
-        "system": {
-            "memory_usage_percent": memory_usage,
-            "cpu_usage_percent": cpu_usage,
-            "disk_usage_percent": disk_usage,
-            "process_id": os.getpid()
-        }
+        "system": get_system_stats()
     }
     
     if db_status == "healthy":
@@ -86,16 +103,23 @@ def readiness_check(db: Session = Depends(get_db)):
     
     Used by Kubernetes/container orchestrators
     """
-    try:
-        # Check database connectivity
-        db.execute(text("SELECT 1"))
+    now = time.monotonic()
+    if now - _ready_cache["checked_at"] >= READY_CACHE_TTL:
+        try:
+            # Check database connectivity; the session only connects here
+            db.execute(text("SELECT 1"))
+            _ready_cache["error"] = None
+        except Exception as e:
+            _ready_cache["error"] = str(e)
+        _ready_cache["checked_at"] = now
+    
+    if _ready_cache["error"] is None:
         return {"status": "ready", "service": settings.service_name}
-    except Exception as e:
-        return {
-            "status": "not_ready",
-            "service": settings.service_name,
-            "error": str(e)
-        }
+    return {
+        "status": "not_ready",
+        "service": settings.service_name,
+        "error": _ready_cache["error"]
+    }
 
 
 @router.get("/live", status_code=status.HTTP_200_OK)
@@ -1,20 +1,48 @@
 """
 Metrics tracking for template operations
+
+Counters and histograms live in the Prometheus client, which updates them in
+C-level atomics; /metrics exposes them in the text format and
+/api/v1/metrics renders a JSON snapshot from the same collectors. The JSON
+render_stats keep their window of recent render times alongside the
+histogram, which can't give min/max.
 """
 
 import logging
-from typing import Dict
-from collections import defaultdict
+from threading import Lock
+from typing import Deque, Dict
+from collections import defaultdict, deque
 from fastapi import APIRouter, status
+from prometheus_client import Counter, Histogram
 
 from app.utils.response import success_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/metrics", tags=["Metrics"])
 
-# In-memory metrics storage (for production, use Prometheus or similar)
-operation_metrics: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
-render_times: Dict[str, list] = defaultdict(list)
+OPERATIONS = Counter(
+    "template_operations_total",
+    "Template operations by type and outcome",
+    ["operation", "status"]
+)
+
+HTTP_REQUESTS = Counter(
+    "template_http_requests_total",
+    "Total HTTP requests",
+    ["method", "endpoint", "status"]
+)
+
+RENDER_DURATION = Histogram(
+    "template_render_duration_seconds",
+    "Template render duration",
+    ["template_id"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+# Last RENDER_WINDOW render times per template; deque evicts the oldest in O(1)
+RENDER_WINDOW = 100
+render_times: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=RENDER_WINDOW))
+_render_times_lock = Lock()
 
 
 def track_operation(operation: str, status: str) -> None:
@@ -25,8 +53,7 @@ def track_operation(operation: str, status: str) -> None:
         operation: Operation type (create, update, delete, render, etc.)
         status: Operation status (success, error, not_found)
     """
-    operation_metrics[operation][status] += 1
-    logger.debug(f"Tracked operation: {operation} - {status}")
+    OPERATIONS.labels(operation, status).inc()
 
 
 def track_request(method: str, endpoint: str, status_code: int) -> None:
@@ -35,13 +62,10 @@ def track_request(method: str, endpoint: str, status_code: int) -> None:
     
     Args:
         method: HTTP method (GET, POST, PUT, DELETE, etc.)
-        endpoint: Request endpoint path
+        endpoint: Route path template (keeps label cardinality bounded)
         status_code: HTTP response status code
     """
-    key = f"{method}:{endpoint}"
-    operation_metrics["requests"][key] += 1
-    operation_metrics["status_codes"][str(status_code)] += 1
-    logger.debug(f"Tracked request: {method} {endpoint} - {status_code}")
+    HTTP_REQUESTS.labels(method, endpoint, str(status_code)).inc()
 
 
 def track_render_time(template_id: str, duration: float) -> None:
@@ -52,11 +76,9 @@ def track_render_time(template_id: str, duration: float) -> None:
         template_id: Template identifier
         duration: Render duration in seconds
     """
-    render_times[template_id].append(duration)
-    # Keep only last 100 render times per template
-    if len(render_times[template_id]) > 100:
-        render_times[template_id] = render_times[template_id][-100:]
-    logger.debug(f"Tracked render time for {template_id}: {duration:.3f}s")
+    RENDER_DURATION.labels(template_id).observe(duration)
+    with _render_times_lock:
+        render_times[template_id].append(duration)
 
 
 def get_metrics() -> Dict:
@@ -66,28 +88,50 @@ def get_metrics() -> Dict:
     Returns:
         Dictionary containing operation counts and render statistics
     """
-    metrics = {
-        "operations": dict(operation_metrics),
-        "render_stats": {}
-    }
+    operations: Dict[str, Dict[str, int]] = defaultdict(dict)
     
-    # Calculate render time statistics
-    for template_id, times in render_times.items():
-        if times:
-            metrics["render_stats"][template_id] = {
-                "count": len(times),
-                "avg_time": sum(times) / len(times),
-                "min_time": min(times),
-                "max_time": max(times)
-            }
+    for sample in OPERATIONS.collect()[0].samples:
+        if sample.name.endswith("_total"):
+            operations[sample.labels["operation"]][sample.labels["status"]] = int(sample.value)
     
-    return metrics
+    requests: Dict[str, int] = defaultdict(int)
+    status_codes: Dict[str, int] = defaultdict(int)
+    for sample in HTTP_REQUESTS.collect()[0].samples:
+        if sample.name.endswith("_total"):
+            labels = sample.labels
+            requests[f"{labels['method']}:{labels['endpoint']}"] += int(sample.value)
+            status_codes[labels["status"]] += int(sample.value)
+    if requests:
+        operations["requests"] = dict(requests)
+        operations["status_codes"] = dict(status_codes)
+    
+    # Statistics over each template's last RENDER_WINDOW renders
+    with _render_times_lock:
+        windows = {template_id: list(times) for template_id, times in render_times.items() if times}
+    
+    render_stats = {
+        template_id: {
+            "count": len(times),
+            "avg_time": sum(times) / len(times),
+            "min_time": min(times),
+            "max_time": max(times)
+        }
+        for template_id, times in windows.items()
+    }
+    
+    return {
+        "operations": dict(operations),
+        "render_stats": render_stats
+    }
 
 
 def reset_metrics() -> None:
     """Reset all metrics (useful for testing)"""
-    operation_metrics.clear()
-    render_times.clear()
+    OPERATIONS.clear()
+    HTTP_REQUESTS.clear()
+    RENDER_DURATION.clear()
+    with _render_times_lock:
+        render_times.clear()
     logger.info("Metrics reset")
 
 
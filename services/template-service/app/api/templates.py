@@ -3,6 +3,8 @@ Template CRUD API endpoints
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import time
@@ -12,22 +14,33 @@ from app.database import get_db
 from app.services.template_service import TemplateService
 from app.schemas import (
     TemplateCreate, TemplateUpdate, TemplateResponse, 
-    TemplateDetailResponse, RenderRequest, RenderResponse,
+    RenderRequest,
     TemplateTranslationCreate, TemplateVersionResponse
 )
 from app.utils.response import success_response, error_response
 from app.api.metrics import track_operation, track_render_time
-from app.models import TemplateVersion
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/templates", tags=["Templates"])
 
+template_list_adapter = TypeAdapter(List[TemplateResponse])
+
+
+async def get_template_service(db: Session = Depends(get_db)) -> TemplateService:
+    """
+    Dependency for getting a TemplateService bound to the request's session
+    
+    async so FastAPI builds it on the event loop rather than a threadpool hop;
+    the constructor only wires up process-wide clients.
+    """
+    return TemplateService(db)
+
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 def create_template(
     template_data: TemplateCreate,
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     Create a new notification template
@@ -40,14 +53,7 @@ def create_template(
     - **language_code**: Initial language (default: 'en')
     """
     try:
-        service = TemplateService(db)
-        template = service.create_template(template_data)
-        
-        # Get current version for response
-        current_version = db.query(TemplateVersion).filter(
-            TemplateVersion.template_id == template.id,
-            TemplateVersion.is_current == True
-        ).first()
+        template, current_version = service.create_template(template_data)
         
         response_data = TemplateResponse(
             id=template.id,
@@ -91,7 +97,7 @@ def list_templates(
     type: Optional[str] = Query(None, pattern="^(email|push|sms)$", description="Filter by type"),
     category: Optional[str] = Query(None, description="Filter by category"),
     search: Optional[str] = Query(None, description="Search in name/description"),
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     List all templates with pagination and filters
@@ -99,10 +105,9 @@ def list_templates(
     Supports filtering by:
     - **type**: email, push, or sms
     - **category**: Template category
-    - **search**: Search term for name/description
+    - **search**: Search term for name/description (multiple words use ranked full-text search once migrations are applied)
     """
     try:
-        service = TemplateService(db)
         skip = (page - 1) * limit
         
         templates, total = service.list_templates(
@@ -114,36 +119,37 @@ def list_templates(
         )
         
         # Build response with current versions
-        response_data = []
-        for template in templates:
-            current_version = db.query(TemplateVersion).filter(
-                TemplateVersion.template_id == template.id,
-                TemplateVersion.is_current == True
-            ).first()
-            
-            template_response = TemplateResponse(
-                id=template.id,
-                template_id=template.template_id,
-                name=template.name,
-                description=template.description,
-                type=template.type,
-                category=template.category,
-                is_active=template.is_active,
-                created_at=template.created_at,
-                updated_at=template.updated_at,
-                current_version=current_version
-            )
-            response_data.append(template_response.model_dump())
+        # Validate and dump the whole page in one call each instead of per row
+        rows = [
+            {
+                "id": template.id,
+                "template_id": template.template_id,
+                "name": template.name,
+                "description": template.description,
+                "type": template.type,
+                "category": template.category,
+                "is_active": template.is_active,
+                "created_at": template.created_at,
+                "updated_at": template.updated_at,
+                "current_version": current_version
+            }
+            for template, current_version in templates
+        ]
+        response_data = template_list_adapter.dump_python(
+            template_list_adapter.validate_python(rows, from_attributes=True)
+        )
         
         track_operation("list", "success")
         
-        return success_response(
+        # Already plain data: hand it straight to orjson instead of another
+        # jsonable_encoder pass over every row
+        return ORJSONResponse(success_response(
             message="Templates retrieved successfully",
             data=response_data,
             total=total,
             limit=limit,
             page=page
-        )
+        ))
     
     except Exception as e:
         track_operation("list", "error")
@@ -157,14 +163,13 @@ def list_templates(
 @router.get("/{template_id}", status_code=status.HTTP_200_OK)
 def get_template(
     template_id: str,
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     Get a specific template by template_id with all versions and translations
     """
     try:
-        service = TemplateService(db)
-        template = service.get_template(template_id)
+        template = service.get_template_detail(template_id)
         
         if not template:
             track_operation("get", "not_found")
@@ -173,29 +178,13 @@ def get_template(
                 error="TEMPLATE_NOT_FOUND"
             )
         
-        # Build detailed response
-        response_data = TemplateDetailResponse(
-            id=template.id,
-            template_id=template.template_id,
-            name=template.name,
-            description=template.description,
-            type=template.type,
-            category=template.category,
-            is_active=template.is_active,
-            created_at=template.created_at,
-            updated_at=template.updated_at,
-            current_version=next((v for v in template.versions if v.is_current), None),
-            versions=template.versions,
-            translations=template.translations
-        )
-        
         track_operation("get", "success")
         
-        return success_response(
+        return ORJSONResponse(success_response(
             message="Template retrieved successfully",
-            data=response_data.model_dump(),
+            data=template,
             total=1
-        )
+        ))
     
     except Exception as e:
         track_operation("get", "error")
@@ -210,7 +199,7 @@ def get_template(
 def update_template(
     template_id: str,
     update_data: TemplateUpdate,
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     Update a template (creates new version if content changes)
@@ -218,8 +207,7 @@ def update_template(
     If body or subject is updated, a new version is automatically created
     """
     try:
-        service = TemplateService(db)
-        template = service.update_template(template_id, update_data)
+        template, current_version = service.update_template(template_id, update_data)
         
         if not template:
             track_operation("update", "not_found")
@@ -228,12 +216,6 @@ def update_template(
                 error="TEMPLATE_NOT_FOUND"
             )
         
-        # Get current version
-        current_version = db.query(TemplateVersion).filter(
-            TemplateVersion.template_id == template.id,
-            TemplateVersion.is_current == True
-        ).first()
-        
         response_data = TemplateResponse(
             id=template.id,
             template_id=template.template_id,
@@ -272,7 +254,7 @@ def update_template(
 @router.delete("/{template_id}", status_code=status.HTTP_200_OK)
 def delete_template(
     template_id: str,
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     Soft delete a template (sets is_active to False)
@@ -280,7 +262,6 @@ def delete_template(
     Template remains in database but won't appear in listings
     """
     try:
-        service = TemplateService(db)
         success = service.delete_template(template_id)
         
         if not success:
@@ -311,7 +292,7 @@ def delete_template(
 def render_template(
     template_id: str,
     render_request: RenderRequest,
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     Render a template with provided data
@@ -332,7 +313,6 @@ def render_template(
     start_time = time.time()
     
     try:
-        service = TemplateService(db)
         result = service.render_template(
             template_id,
             render_request.data,
@@ -346,12 +326,6 @@ def render_template(
                 error="TEMPLATE_NOT_FOUND"
             )
         
-        response_data = RenderResponse(
-            subject=result["subject"],
-            body=result["body"],
-            variables_used=result["variables_used"]
-        )
-        
         # Track render time
         duration = time.time() - start_time
         track_render_time(template_id, duration)
@@ -359,11 +333,13 @@ def render_template(
         
         logger.info(f"Template '{template_id}' rendered in {duration:.3f}s")
         
-        return success_response(
+        # result is the service's {subject, body, variables_used} dict (the
+        # RenderResponse shape); no need to validate it again on the way out
+        return ORJSONResponse(success_response(
             message="Template rendered successfully",
-            data=response_data.model_dump(),
+            data=result,
             total=1
-        )
+        ))
     
     except ValueError as e:
         track_operation("render", "error")
@@ -385,7 +361,7 @@ def render_template(
 def add_translation(
     template_id: str,
     translation_data: TemplateTranslationCreate,
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     Add or update a translation for a template
@@ -393,7 +369,6 @@ def add_translation(
     Allows supporting multiple languages for the same template
     """
     try:
-        service = TemplateService(db)
         translation = service.add_translation(
             template_id,
             translation_data.language_code,
@@ -434,7 +409,7 @@ def add_translation(
 @router.get("/{template_id}/versions", status_code=status.HTTP_200_OK)
 def get_template_versions(
     template_id: str,
-    db: Session = Depends(get_db)
+    service: TemplateService = Depends(get_template_service)
 ):
     """
     Get all versions of a template
@@ -442,18 +417,15 @@ def get_template_versions(
     Returns version history ordered by creation date (newest first)
     """
     try:
-        service = TemplateService(db)
-        template = service.get_template(template_id)
+        versions = service.get_template_versions(template_id)
         
-        if not template:
+        if versions is None:
             track_operation("get_versions", "not_found")
             return error_response(
                 message=f"Template with id '{template_id}' not found",
                 error="TEMPLATE_NOT_FOUND"
             )
         
-        versions = service.get_template_versions(template_id)
-        
         response_data = [{
             "id": str(v.id),
             "version": v.version,
@@ -468,11 +440,11 @@ def get_template_versions(
         
         track_operation("get_versions", "success")
         
-        return success_response(
+        return ORJSONResponse(success_response(
             message="Template versions retrieved successfully",
             data=response_data,
             total=len(versions)
-        )
+        ))
     
     except Exception as e:
         track_operation("get_versions", "error")
@@ -484,14 +456,13 @@ def get_template_versions(
 
 
 @router.get("/stats/summary", status_code=status.HTTP_200_OK)
-def get_statistics(db: Session = Depends(get_db)):
+def get_statistics(service: TemplateService = Depends(get_template_service)):
     """
     Get template service statistics
     
     Returns counts of templates, versions, and translations
     """
     try:
-        service = TemplateService(db)
         stats = service.get_statistics()
         
         return success_response(
@@ -2,7 +2,7 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.pool import Pool
 from app.config import get_settings
@@ -12,20 +12,26 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Create engine with connection pooling
+# Create engine with connection pooling. LIFO checkout keeps reusing the most
+# recently used connections so idle extras can age out via pool_recycle.
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_use_lifo=True,
     pool_recycle=3600,
-    echo=settings.debug
+    # SQL echo only when debugging at DEBUG level; DEBUG=true alone is common outside dev
+    echo=settings.debug and settings.log_level == "DEBUG"
 )
 
-# Session factory
+# Session factory. Sessions are per-request, so objects are left loaded after
+# commit: the rows a write endpoint just inserted are serialized without a reload.
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
+    expire_on_commit=False,
     bind=engine
 )
 
@@ -33,17 +39,18 @@ SessionLocal = sessionmaker(
 Base = declarative_base()
 
 
-# Connection pool logging
-@event.listens_for(Pool, "connect")
-def receive_connect(dbapi_conn, connection_record):
-    """Log database connections"""
-    logger.debug("Database connection established")
+# Connection pool logging. Only registered at DEBUG: the checkout listener
+# would otherwise run on every query just to be filtered out.
+if settings.log_level == "DEBUG":
+    @event.listens_for(Pool, "connect")
+    def receive_connect(dbapi_conn, connection_record):
+        """Log database connections"""
+        logger.debug("Database connection established")
 
-
-@event.listens_for(Pool, "checkout")
-def receive_checkout(dbapi_conn, connection_record, connection_proxy):
-    """Log connection checkout from pool"""
-    logger.debug("Connection checked out from pool")
+    @event.listens_for(Pool, "checkout")
+    def receive_checkout(dbapi_conn, connection_record, connection_proxy):
+        """Log connection checkout from pool"""
+        logger.debug("Connection checked out from pool")
 
 
 def get_db():
@@ -71,9 +78,9 @@ def init_db():
 def check_db_connection() -> bool:
     """Check if database is accessible"""
     try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        # A bare pooled connection is enough; no Session needed for a probe
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
         logger.error(f"Database connection failed: {str(e)}")
@@ -4,43 +4,41 @@ FastAPI application entry point
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import anyio.to_thread
+import itertools
 import time
 import logging
-import sys
+import uuid
 from typing import Union
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 from app.config import get_settings
-from app.database import init_db, check_db_connection
+from app.logging_config import configure_logging
+from app.database import SessionLocal, init_db, check_db_connection
 from app.api import templates, health, metrics
 from app.api.metrics import track_request
+from app.services.template_service import TemplateService
+from app.utils.response import pagination_meta
 from app.utils.rabbitmq import rabbitmq_client
 from app.utils.cache import cache_client
 
 # Configure logging
 settings = get_settings()
+configure_logging(settings.log_level)
 
-logging.basicConfig(
-    level=getattr(logging, settings.log_level),
-    format='{"timestamp": "%(asctime)s", "level": "%(levelname)s", "service": "%(name)s", "message": "%(message)s", "correlation_id": "%(correlation_id)s"}',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-# Add correlation_id filter
-class CorrelationIdFilter(logging.Filter):
-    def filter(self, record):
-        if not hasattr(record, 'correlation_id'):
-            record.correlation_id = 'none'
-        return True
+logger = logging.getLogger(__name__)
 
-for handler in logging.root.handlers:
-    handler.addFilter(CorrelationIdFilter())
+# Generated correlation IDs: per-process random prefix + counter, unique without
+# reading the clock
+_cid_prefix = f"gen-{uuid.uuid4().hex[:8]}-"
+_cid_counter = itertools.count()
 
-logger = logging.getLogger(__name__)
+# Probe and scrape endpoints polled every few seconds; they skip request logging,
+# timing headers and request metrics
+UNTRACKED_PATHS = frozenset({"/health", "/ready", "/live", "/metrics"})
 
 
 @asynccontextmanager
@@ -52,6 +50,9 @@ async def lifespan(app: FastAPI):
     logger.info(f"Environment: {settings.environment}")
     logger.info("=" * 50)
     
+    # Sync endpoints run in anyio's threadpool, which defaults to 40 threads
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.thread_pool_size
+    
     # Skip database initialization if running tests (dependency override is set)
     if not app.dependency_overrides:
         # Initialize database
@@ -68,12 +69,21 @@ async def lifespan(app: FastAPI):
         else:
             logger.warning("⚠️ Database connection check failed")
         
+        # Compile stored templates now so first renders don't pay for it
+        try:
+            with SessionLocal() as db:
+                TemplateService(db).warm_renderer()
+        except Exception as e:
+            logger.warning(f"⚠️ Template precompilation failed: {str(e)}")
+        
         # Initialize RabbitMQ
         try:
             if rabbitmq_client.connect():
                 logger.info("✅ RabbitMQ connected successfully")
             else:
                 logger.warning("⚠️ RabbitMQ connection failed, events disabled")
+            # Started either way: publish_batch reconnects once the broker is up
+            rabbitmq_client.start_publisher()
         except Exception as e:
             logger.warning(f"⚠️ RabbitMQ initialization failed: {str(e)}")
         
@@ -96,8 +106,9 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Template Service...")
     
-    # Close RabbitMQ connection
+    # Flush queued events, then close RabbitMQ connection
     try:
+        rabbitmq_client.stop_publisher()
         rabbitmq_client.close()
         logger.info("✅ RabbitMQ connection closed")
     except Exception as e:
@@ -114,6 +125,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -131,10 +143,13 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     """Log all requests and add correlation ID"""
+    if request.url.path in UNTRACKED_PATHS:
+        return await call_next(request)
+    
     start_time = time.time()
     
     # Get or generate correlation ID
-    correlation_id = request.headers.get("X-Correlation-ID", f"gen-{int(time.time()*1000)}")
+    correlation_id = request.headers.get("X-Correlation-ID") or f"{_cid_prefix}{next(_cid_counter):x}"
     
     # Add to request state for access in routes
     request.state.correlation_id = correlation_id
@@ -164,10 +179,11 @@ async def log_requests(request: Request, call_next):
     # Calculate duration
     duration = time.time() - start_time
     
-    # Track metrics
+    # Track metrics by route template so ids in the path don't create new series
+    route = request.scope.get("route")
     track_request(
         method=request.method,
-        endpoint=request.url.path,
+        endpoint=route.path if route is not None else "unmatched",
         status_code=response.status_code
     )
     
@@ -207,14 +223,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "error": "VALIDATION_ERROR",
             "message": "Request validation failed",
             "details": exc.errors(),
-            "meta": {
-                "total": 0,
-                "limit": 10,
-                "page": 1,
-                "total_pages": 0,
-                "has_next": False,
-                "has_previous": False
-            }
+            "meta": pagination_meta(total=0, limit=10, page=1)
         }
     )
 
@@ -243,14 +252,7 @@ async def global_exception_handler(request: Request, exc: Exception):
             "error": "INTERNAL_SERVER_ERROR",
             "message": "An unexpected error occurred",
             "correlation_id": correlation_id,
-            "meta": {
-                "total": 0,
-                "limit": 10,
-                "page": 1,
-                "total_pages": 0,
-                "has_next": False,
-                "has_previous": False
-            }
+            "meta": pagination_meta(total=0, limit=10, page=1)
         }
     )
 
@@ -261,6 +263,12 @@ app.include_router(templates.router)
 app.include_router(metrics.router)
 
 
+@app.get("/metrics", tags=["Metrics"], include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus metrics endpoint"""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/", tags=["Root"])
 def root():
     """Root endpoint - service information"""
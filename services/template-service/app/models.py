@@ -2,10 +2,9 @@
 SQLAlchemy database models
 """
 
-from sqlalchemy import Column, String, Text, Boolean, DateTime, JSON, ForeignKey, Index
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Text, Boolean, DateTime, JSON, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import relationship
-from datetime import datetime, timezone
 import uuid
 from app.database import Base
 
@@ -16,8 +15,21 @@ class Template(Base):
     __tablename__ = "templates"
     __table_args__ = (
         # Unique constraint only for active templates
-        Index('ix_templates_template_id_active', 'template_id', unique=True, postgresql_where=(Column('is_active') == True)),
+        Index(
+            'ix_templates_template_id_active', 'template_id', unique=True,
+            postgresql_where=(Column('is_active') == True),
+            sqlite_where=(Column('is_active') == True)
+        ),
+        # Active templates newest first (list_templates)
+        Index(
+            'ix_templates_active_created_at', Column('created_at').desc(),
+            postgresql_where=(Column('is_active') == True),
+            sqlite_where=(Column('is_active') == True)
+        ),
     )
+    # Timestamps are set by the database; read them back with RETURNING.
+    # create_template relies on this instead of refreshing after commit.
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     template_id = Column(String(100), nullable=False, index=True)
@@ -26,8 +38,8 @@ class Template(Base):
     type = Column(String(50), nullable=False, index=True)  # email, push, sms
     category = Column(String(100), nullable=True, index=True)  # welcome, alert, marketing
     is_active = Column(Boolean, default=True, index=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     versions = relationship(
@@ -51,16 +63,27 @@ class TemplateVersion(Base):
     """Template version history"""
     
     __tablename__ = "template_versions"
+    __table_args__ = (
+        # At most one current version per template; makes current-version lookups an index probe
+        Index(
+            'ix_template_versions_current', 'template_id', unique=True,
+            postgresql_where=(Column('is_current') == True),
+            sqlite_where=(Column('is_current') == True)
+        ),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id", ondelete="CASCADE"), nullable=False, index=True)
     version = Column(String(20), nullable=False)  # 1.0.0, 1.0.1, etc.
     subject = Column(String(500), nullable=True)  # For email templates
     body = Column(Text, nullable=False)
-    variables = Column(JSON, nullable=False, default=list)  # ["name", "email"]
-    template_metadata = Column(JSON, nullable=True, default=dict)
+    # Native text[] on Postgres (GIN-indexed by migration for @> / && lookups); JSON elsewhere
+    variables = Column(JSON().with_variant(ARRAY(String), "postgresql"), nullable=False, default=list)  # ["name", "email"]
+    # JSONB on Postgres so @> containment can use the jsonb_path_ops GIN index
+    template_metadata = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True, default=dict)
     is_current = Column(Boolean, default=True, index=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     created_by = Column(String(100), nullable=True)
     
     # Relationship
@@ -74,6 +97,11 @@ class TemplateTranslation(Base):
     """Multi-language template support"""
     
     __tablename__ = "template_translations"
+    __table_args__ = (
+        # One translation per language; also the conflict target for add_translation's upsert
+        Index('ix_template_translations_template_language', 'template_id', 'language_code', unique=True),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     template_id = Column(UUID(as_uuid=True), ForeignKey("templates.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -81,8 +109,8 @@ class TemplateTranslation(Base):
     subject = Column(String(500), nullable=True)
     body = Column(Text, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationship
     template = relationship("Template", back_populates="translations")
@@ -6,6 +6,9 @@ from pydantic import BaseModel, Field, field_validator, ConfigDict
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
+import re
+
+TEMPLATE_ID_PATTERN = re.compile(r'^[a-z0-9_-]+$')
 
 
 # ==================== Standard Response Format ====================
@@ -98,8 +101,7 @@ class TemplateBase(BaseModel):
     def validate_template_id(cls, v):
         """Ensure valid template ID format"""
         # Allow letters, numbers, underscore, hyphen
-        import re
-        if not re.match(r'^[a-z0-9_-]+$', v.lower()):
+        if not TEMPLATE_ID_PATTERN.match(v.lower()):
             raise ValueError('template_id must contain only lowercase letters, numbers, underscore, or hyphen')
         return v.lower()
 
@@ -2,22 +2,99 @@
 Template service - Business logic layer
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_, func, inspect, literal_column, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from functools import lru_cache
 from typing import List, Optional, Dict, Any, Tuple
-from uuid import UUID
+from uuid import UUID, uuid4
+import hashlib
+import json
 import logging
 import time
 
 from app.models import Template, TemplateVersion, TemplateTranslation
-from app.schemas import TemplateCreate, TemplateUpdate
-from app.utils.renderer import TemplateRenderer
+from app.schemas import TemplateCreate, TemplateUpdate, TemplateDetailResponse
+from app.utils.renderer import get_renderer, template_variables
+from app.utils import template_cache
 
+from app.config import get_settings
 from app.utils.rabbitmq import get_rabbitmq_client
 from app.utils.cache import get_cache_client
 
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@lru_cache(maxsize=256)
+def normalize_language_code(language_code: str) -> str:
+    """Match the lowercase, stripped form translations are stored in"""
+    return language_code.strip().lower()
+
+
+def collect_variables(body: str, subject: Optional[str]) -> List[str]:
+    """Unique variable names across a version's body and subject"""
+    names = template_variables(body)
+    if subject:
+        names = names | template_variables(subject)
+    return list(names)
+
+
+@lru_cache(maxsize=None)
+def has_search_vector(engine: Engine) -> bool:
+    """
+    Whether templates.search_vec exists on this database
+    
+    Only migration 5c2e8a1f4b90 adds it; a schema built by init_db() has no
+    such column. Checked once per engine, so a migration applied while the
+    service is running takes effect on restart.
+    """
+    if engine.dialect.name != "postgresql":
+        return False
+    return any(c["name"] == "search_vec" for c in inspect(engine).get_columns("templates"))
+
+
+def full_text_search(search: str):
+    """Condition and ts_rank for a websearch-style query against search_vec"""
+    search_vec = literal_column("templates.search_vec")
+    ts_query = func.websearch_to_tsquery("simple", search)
+    return search_vec.op("@@")(ts_query), func.ts_rank(search_vec, ts_query)
+
+
+# Partial unique index on active template_ids (see app.models.Template)
+TEMPLATE_ID_INDEX = "ix_templates_template_id_active"
+
+
+def is_duplicate_template_id(error: IntegrityError) -> bool:
+    """Whether an IntegrityError is the active template_id index rejecting a duplicate"""
+    orig = error.orig
+    if getattr(orig, "pgcode", None) is not None:
+        # 23505 unique_violation, on this index rather than any other constraint
+        diag = getattr(orig, "diag", None)
+        return orig.pgcode == "23505" and getattr(diag, "constraint_name", None) == TEMPLATE_ID_INDEX
+    # SQLite reports the indexed column instead of the index name
+    return "UNIQUE constraint failed: templates.template_id" in str(orig)
+
+
+def render_cache_key(template_id: str, generation: int, language_code: str, data: Dict[str, Any]) -> str:
+    """
+    Redis key for a rendered template; identical data gives the same key regardless of order
+    
+    Includes the template's generation, so a render a worker computed from a
+    template that has since changed is written under a key no one reads.
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return f"rt:{template_id}:{generation}:{language_code}:{digest}"
+
+
+def generation_key(template_id: str) -> str:
+    """Redis counter bumped on every write to a template"""
+    return f"tpl:gen:{template_id}"
 
 
 class TemplateService:
@@ -31,11 +108,22 @@ class TemplateService:
             db: Database session
         """
         self.db = db
-        self.renderer = TemplateRenderer()
+        self.renderer = get_renderer()
         self.rabbitmq = get_rabbitmq_client()
         self.cache = get_cache_client()
     
-    def create_template(self, template_data: TemplateCreate) -> Template:
+    def template_generation(self, template_id: str) -> int:
+        """Current write generation of a template; 0 if never written or Redis is off"""
+        return self.cache.get(generation_key(template_id)) or 0
+    
+    def invalidate_template(self, template_id: str) -> None:
+        """Make every worker drop cached copies of a template after a write"""
+        self.cache.incr(generation_key(template_id))
+        template_cache.invalidate(template_id)
+        self.cache.delete(f"template:{template_id}")
+        self.cache.delete_pattern(f"rt:{template_id}:*")
+    
+    def create_template(self, template_data: TemplateCreate) -> Tuple[Template, TemplateVersion]:
         """
         Create a new template with initial version and translation
         
@@ -43,42 +131,26 @@ class TemplateService:
             template_data: Template creation data
             
         Returns:
-            Created template
+            Tuple of (created template, its current version)
             
         Raises:
             ValueError: If template_id already exists
         """
-        # Check if active template_id already exists
-        existing = self.db.query(Template).filter(
-            and_(
-                Template.template_id == template_data.template_id,
-                Template.is_active == True
-            )
-        ).first()
-        
-        if existing:
-            logger.warning(f"Template ID '{template_data.template_id}' already exists")
-            raise ValueError(f"Template with ID '{template_data.template_id}' already exists")
-        
         # Extract variables from body and subject
-        variables = self.renderer.extract_variables(template_data.body)
-        if template_data.subject:
-            subject_vars = self.renderer.extract_variables(template_data.subject)
-            variables.extend(subject_vars)
-        variables = list(set(variables))  # Remove duplicates
+        variables = collect_variables(template_data.body, template_data.subject)
         
         logger.info(f"Creating template '{template_data.template_id}' with {len(variables)} variables")
         
-        # Create template
+        # Create template; the id is generated here rather than read back from a
+        # flush, so all three rows go out with the commit
         template = Template(
+            id=uuid4(),
             template_id=template_data.template_id,
             name=template_data.name,
             description=template_data.description,
             type=template_data.type,
             category=template_data.category
         )
-        self.db.add(template)
-        self.db.flush()  # Get the template ID
         
         # Create initial version (1.0.0)
         version = TemplateVersion(
@@ -88,9 +160,8 @@ class TemplateService:
             body=template_data.body,
             variables=variables,
             is_current=True,
-            metadata={"initial_version": True}
+            template_metadata={"initial_version": True}
         )
-        self.db.add(version)
         
         # Create initial translation
         translation = TemplateTranslation(
@@ -99,13 +170,24 @@ class TemplateService:
             subject=template_data.subject,
             body=template_data.body
         )
-        self.db.add(translation)
         
-        self.db.commit()
-        self.db.refresh(template)
+        # No refresh needed: created_at/updated_at are server defaults, read back
+        # by the INSERT's RETURNING because the models set eager_defaults (keep
+        # it; the response serializes those timestamps). A duplicate active
+        # template_id is rejected by its unique index, which also covers two
+        # creates racing for the same id.
+        self.db.add_all([template, version, translation])
+        try:
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            if not is_duplicate_template_id(e):
+                raise
+            logger.warning(f"Template ID '{template_data.template_id}' already exists")
+            raise ValueError(f"Template with ID '{template_data.template_id}' already exists")
         
         # Publish event
-        self.rabbitmq.publish_event(
+        self.rabbitmq.enqueue_event(
             routing_key='template.created',
             message={
                 'template_id': template.template_id,
@@ -116,7 +198,7 @@ class TemplateService:
         )
         
         logger.info(f"Template '{template_data.template_id}' created successfully")
-        return template
+        return template, version
     
     def get_template(self, template_id: str) -> Optional[Template]:
         """
@@ -153,6 +235,60 @@ class TemplateService:
         
         return template
     
+    def get_template_detail(
+        self,
+        template_id: str,
+        generation: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get template with its versions and translations as a plain dict
+        
+        Read-through the in-process template cache, so hot templates skip the DB.
+        
+        Args:
+            template_id: Template identifier
+            generation: Current generation, if the caller already looked it up
+            
+        Returns:
+            TemplateDetailResponse dict if found, None otherwise
+        """
+        if generation is None:
+            generation = self.template_generation(template_id)
+        detail = template_cache.get(template_id, generation)
+        if detail is not None:
+            return detail
+        
+        # Both collections are serialized below, so load them up front with one
+        # IN query each instead of lazy loads fired from inside model validation
+        template = self.db.query(Template).options(
+            selectinload(Template.versions),
+            selectinload(Template.translations)
+        ).filter(
+            and_(
+                Template.template_id == template_id,
+                Template.is_active == True
+            )
+        ).first()
+        if not template:
+            return None
+        
+        detail = TemplateDetailResponse(
+            id=template.id,
+            template_id=template.template_id,
+            name=template.name,
+            description=template.description,
+            type=template.type,
+            category=template.category,
+            is_active=template.is_active,
+            created_at=template.created_at,
+            updated_at=template.updated_at,
+            current_version=next((v for v in template.versions if v.is_current), None),
+            versions=template.versions,
+            translations=template.translations
+        ).model_dump()
+        template_cache.put(template_id, generation, detail)
+        return detail
+    
     def get_template_by_uuid(self, uuid: UUID) -> Optional[Template]:
         """
         Get template by UUID
@@ -173,7 +309,7 @@ class TemplateService:
         category: Optional[str] = None,
         search: Optional[str] = None,
         is_active: Optional[bool] = True
-    ) -> Tuple[List[Template], int]:
+    ) -> Tuple[List[Tuple[Template, Optional[TemplateVersion]]], int]:
         """
         List templates with pagination and filters
         
@@ -186,7 +322,7 @@ class TemplateService:
             is_active: Filter by active status
             
         Returns:
-            Tuple of (templates list, total count)
+            Tuple of ([(template, current version or None), ...], total count)
         """
         query = self.db.query(Template)
         
@@ -200,7 +336,15 @@ class TemplateService:
         if category:
             query = query.filter(Template.category == category)
         
-        if search:
+        order_by = [Template.created_at.desc()]
+        if search and len(search.split()) > 1 and has_search_vector(self.db.get_bind().engine):
+            # Multi-word queries go to full-text search over the generated,
+            # GIN-indexed search_vec column, best matches first
+            condition, rank = full_text_search(search)
+            query = query.filter(condition)
+            order_by.insert(0, rank.desc())
+        elif search:
+            # Single terms keep substring matching, served by the trigram indexes
             search_pattern = f"%{search}%"
             query = query.filter(
                 or_(
@@ -210,11 +354,28 @@ class TemplateService:
                 )
             )
         
-        # Get total count
-        total = query.count()
-        
-        # Apply pagination and sorting
-        templates = query.order_by(Template.created_at.desc()).offset(skip).limit(limit).all()
+        # The current version and the filtered total come back on each page
+        # row, so a page is a single statement
+        rows = query.outerjoin(
+            TemplateVersion,
+            and_(
+                TemplateVersion.template_id == Template.id,
+                TemplateVersion.is_current == True
+            )
+        ).add_entity(TemplateVersion).add_columns(
+            func.count().over().label("total")
+        ).order_by(
+            *order_by
+        ).offset(skip).limit(limit).all()
+        
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Past the last page no rows carry the total; count separately
+            total = query.count()
+        else:
+            total = 0
+        templates = [(template, version) for template, version, _ in rows]
         
         logger.debug(f"Retrieved {len(templates)} templates (total: {total})")
         return templates, total
@@ -223,7 +384,7 @@ class TemplateService:
         self, 
         template_id: str, 
         update_data: TemplateUpdate
-    ) -> Optional[Template]:
+    ) -> Tuple[Optional[Template], Optional[TemplateVersion]]:
         """
         Update template and create new version if content changes
         
@@ -232,12 +393,12 @@ class TemplateService:
             update_data: Update data
             
         Returns:
-            Updated template if found, None otherwise
+            Tuple of (updated template, its current version); (None, None) if not found
         """
         template = self.get_template(template_id)
         if not template:
             logger.warning(f"Template '{template_id}' not found for update")
-            return None
+            return None, None
         
         logger.info(f"Updating template '{template_id}'")
         
@@ -251,18 +412,18 @@ class TemplateService:
         if update_data.is_active is not None:
             template.is_active = update_data.is_active
         
+        # Get current version; it is returned as-is unless the content changes
+        current_version = self.db.query(TemplateVersion).filter(
+            and_(
+                TemplateVersion.template_id == template.id,
+                TemplateVersion.is_current == True
+            )
+        ).first()
+        
         # If body or subject changes, create new version
         content_changed = update_data.body is not None or update_data.subject is not None
         
         if content_changed:
-            # Get current version
-            current_version = self.db.query(TemplateVersion).filter(
-                and_(
-                    TemplateVersion.template_id == template.id,
-                    TemplateVersion.is_current == True
-                )
-            ).first()
-            
             if current_version:
                 # Mark current version as not current
                 current_version.is_current = False
@@ -280,11 +441,7 @@ class TemplateService:
                 new_subject = update_data.subject if update_data.subject is not None else current_version.subject
                 
                 # Extract variables
-                variables = self.renderer.extract_variables(new_body)
-                if new_subject:
-                    subject_vars = self.renderer.extract_variables(new_subject)
-                    variables.extend(subject_vars)
-                variables = list(set(variables))
+                variables = collect_variables(new_body, new_subject)
                 
                 # Create new version
                 new_version = TemplateVersion(
@@ -294,9 +451,10 @@ class TemplateService:
                     body=new_body,
                     variables=variables,
                     is_current=True,
-                    metadata={"updated_from": current_version.version}
+                    template_metadata={"updated_from": current_version.version}
                 )
                 self.db.add(new_version)
+                current_version = new_version
                 
                 logger.info(f"Created new version {new_version_str} for template '{template_id}'")
         
@@ -304,10 +462,10 @@ class TemplateService:
         self.db.refresh(template)
         
         # Invalidate cache
-        self.cache.delete(f"template:{template_id}")
+        self.invalidate_template(template_id)
         
         # Publish event
-        self.rabbitmq.publish_event(
+        self.rabbitmq.enqueue_event(
             routing_key='template.updated',
             message={
                 'template_id': template.template_id,
@@ -316,7 +474,7 @@ class TemplateService:
             }
         )
         
-        return template
+        return template, current_version
     
     def delete_template(self, template_id: str) -> bool:
         """
@@ -337,10 +495,10 @@ class TemplateService:
         self.db.commit()
         
         # Invalidate cache
-        self.cache.delete(f"template:{template_id}")
+        self.invalidate_template(template_id)
         
         # Publish event
-        self.rabbitmq.publish_event(
+        self.rabbitmq.enqueue_event(
             routing_key='template.deleted',
             message={
                 'template_id': template.template_id,
@@ -371,71 +529,90 @@ class TemplateService:
         Raises:
             ValueError: If required variables are missing
         """
-        template = self.get_template(template_id)
+        language_code = normalize_language_code(language_code)
+        
+        # Identical renders are served from Redis until the template changes
+        generation = self.template_generation(template_id)
+        cache_key = render_cache_key(template_id, generation, language_code, data)
+        cached = self.cache.get(cache_key)
+        if cached:
+            return cached
+        
+        template = self.get_template_detail(template_id, generation)
         if not template:
             logger.warning(f"Template '{template_id}' not found for rendering")
             return None
         
         # Get translation for requested language
-        translation = self.db.query(TemplateTranslation).filter(
-            and_(
-                TemplateTranslation.template_id == template.id,
-                TemplateTranslation.language_code == language_code,
-                TemplateTranslation.is_active == True
-            )
-        ).first()
+        translations = {
+            t["language_code"]: t for t in template["translations"] if t["is_active"]
+        }
+        translation = translations.get(language_code)
         
         # Fallback to English if translation not found
         if not translation:
             logger.info(f"Translation for '{language_code}' not found, falling back to 'en'")
-            translation = self.db.query(TemplateTranslation).filter(
-                and_(
-                    TemplateTranslation.template_id == template.id,
-                    TemplateTranslation.language_code == "en",
-                    TemplateTranslation.is_active == True
-                )
-            ).first()
+            translation = translations.get("en")
         
         if not translation:
             logger.error(f"No translation found for template '{template_id}'")
             return None
         
+        subject = translation["subject"]
+        body = translation["body"]
+        
         # Validate variables
-        is_valid, missing = self.renderer.validate_variables(translation.body, data)
+        is_valid, missing = self.renderer.validate_variables(body, data)
         if not is_valid:
             error_msg = f"Missing required variables: {', '.join(missing)}"
             logger.error(error_msg)
             raise ValueError(error_msg)
         
         # Render body
-        rendered_body = self.renderer.render(translation.body, data)
+        rendered_body = self.renderer.render_cached(body, data)
         
         # Render subject if exists
         rendered_subject = None
-        if translation.subject:
+        if subject:
             # Validate subject variables
-            is_valid, missing = self.renderer.validate_variables(translation.subject, data)
+            is_valid, missing = self.renderer.validate_variables(subject, data)
             if not is_valid:
                 error_msg = f"Missing required variables in subject: {', '.join(missing)}"
                 logger.error(error_msg)
                 raise ValueError(error_msg)
             
-            rendered_subject = self.renderer.render(translation.subject, data)
+            rendered_subject = self.renderer.render_cached(subject, data)
         
-        # Get variables used
-        variables_used = self.renderer.extract_variables(translation.body)
-        if translation.subject:
-            subject_vars = self.renderer.extract_variables(translation.subject)
-            variables_used.extend(subject_vars)
-        variables_used = list(set(variables_used))
+        # Same cached per-source scans validation used; no further passes over the text
+        variables_used = collect_variables(body, subject)
         
         logger.info(f"Template '{template_id}' rendered successfully")
         
-        return {
+        result = {
             "subject": rendered_subject,
             "body": rendered_body,
             "variables_used": variables_used
         }
+        self.cache.set(cache_key, result, ttl=settings.cache_ttl)
+        return result
+    
+    def warm_renderer(self) -> int:
+        """
+        Precompile every active translation of every active template
+        
+        Returns:
+            Number of templates compiled
+        """
+        rows = self.db.execute(
+            select(TemplateTranslation.subject, TemplateTranslation.body)
+            .join(Template, Template.id == TemplateTranslation.template_id)
+            .where(Template.is_active == True, TemplateTranslation.is_active == True)
+        ).all()
+        compiled = self.renderer.warm(
+            source for subject, body in rows for source in (subject, body)
+        )
+        logger.info(f"Precompiled {compiled} templates")
+        return compiled
     
     def add_translation(
         self, 
@@ -456,44 +633,48 @@ class TemplateService:
         Returns:
             Created or updated translation
         """
-        template = self.get_template(template_id)
-        if not template:
+        # Only the primary key is needed; get_template would load the whole row
+        # and round-trip the cache
+        template_pk = self.db.scalar(
+            select(Template.id).where(
+                Template.template_id == template_id,
+                Template.is_active == True
+            )
+        )
+        if template_pk is None:
             logger.warning(f"Template '{template_id}' not found for translation")
             return None
         
-        # Check if translation exists
-        existing = self.db.query(TemplateTranslation).filter(
-            and_(
-                TemplateTranslation.template_id == template.id,
-                TemplateTranslation.language_code == language_code
-            )
-        ).first()
-        
-        if existing:
-            # Update existing translation
-            logger.info(f"Updating existing translation '{language_code}' for template '{template_id}'")
-            existing.subject = subject
-            existing.body = body
-            existing.is_active = True
-            self.db.commit()
-            self.db.refresh(existing)
-            return existing
-        
-        # Create new translation
-        logger.info(f"Creating new translation '{language_code}' for template '{template_id}'")
-        translation = TemplateTranslation(
-            template_id=template.id,
+        # Insert or update in one statement keyed on (template_id, language_code);
+        # RETURNING hands back the row either way
+        insert = pg_insert if self.db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        stmt = insert(TemplateTranslation).values(
+            template_id=template_pk,
             language_code=language_code,
             subject=subject,
-            body=body
+            body=body,
+            is_active=True
         )
-        self.db.add(translation)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TemplateTranslation.template_id, TemplateTranslation.language_code],
+            set_={
+                "subject": stmt.excluded.subject,
+                "body": stmt.excluded.body,
+                "is_active": True,
+                "updated_at": func.now()
+            }
+        ).returning(TemplateTranslation).execution_options(populate_existing=True)
+        
+        translation = self.db.scalars(stmt).one()
         self.db.commit()
-        self.db.refresh(translation)
+        logger.info(f"Saved translation '{language_code}' for template '{template_id}'")
+        
+        # Renders in this language may have fallen back to 'en' until now
+        self.invalidate_template(template_id)
         
         return translation
     
-    def get_template_versions(self, template_id: str) -> List[TemplateVersion]:
+    def get_template_versions(self, template_id: str) -> Optional[List[TemplateVersion]]:
         """
         Get all versions of a template
         
@@ -501,16 +682,21 @@ class TemplateService:
             template_id: Template identifier
             
         Returns:
-            List of template versions, ordered by creation date (newest first)
+            List of template versions, ordered by creation date (newest first);
+            None if the template doesn't exist
         """
-        template = self.get_template(template_id)
-        if not template:
-            return []
-        
-        versions = self.db.query(TemplateVersion).filter(
-            TemplateVersion.template_id == template.id
+        versions = self.db.query(TemplateVersion).join(Template).filter(
+            and_(
+                Template.template_id == template_id,
+                Template.is_active == True
+            )
         ).order_by(TemplateVersion.created_at.desc()).all()
         
+        # Every template is created with a version, so only check existence
+        # separately when the join came back empty
+        if not versions and not self.get_template(template_id):
+            return None
+        
         logger.debug(f"Retrieved {len(versions)} versions for template '{template_id}'")
         return versions
     
@@ -521,22 +707,22 @@ class TemplateService:
         Returns:
             Dictionary with various statistics
         """
-        total_templates = self.db.query(Template).filter(Template.is_active == True).count()
-        total_versions = self.db.query(TemplateVersion).count()
-        total_translations = self.db.query(TemplateTranslation).filter(
-            TemplateTranslation.is_active == True
-        ).count()
-        
-        # Count by type
-        type_counts = {}
-        for template_type in ['email', 'push', 'sms']:
-            count = self.db.query(Template).filter(
-                and_(
-                    Template.type == template_type,
-                    Template.is_active == True
-                )
-            ).count()
-            type_counts[template_type] = count
+        # One round trip: conditional counts over active templates plus the
+        # version/translation totals as scalar subqueries
+        template_types = ('email', 'push', 'sms')
+        row = self.db.execute(
+            select(
+                func.count(Template.id),
+                select(func.count(TemplateVersion.id)).scalar_subquery(),
+                select(func.count(TemplateTranslation.id)).where(
+                    TemplateTranslation.is_active == True
+                ).scalar_subquery(),
+                *(func.count(Template.id).filter(Template.type == t) for t in template_types)
+            ).where(Template.is_active == True)
+        ).one()
+        
+        total_templates, total_versions, total_translations = row[:3]
+        type_counts = dict(zip(template_types, row[3:]))
         
         return {
             "total_templates": total_templates,
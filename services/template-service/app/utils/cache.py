@@ -3,7 +3,7 @@ Redis caching utilities
 """
 
 import redis
-import json
+import orjson
 import logging
 from typing import Optional, Any
 from app.config import get_settings
@@ -24,12 +24,16 @@ class CacheClient:
         try:
             redis_url = getattr(settings, 'redis_url', None)
             if redis_url:
-                self.client = redis.from_url(
+                # Shared pool for all request threads; values are orjson bytes,
+                # so responses aren't decoded to str
+                pool = redis.ConnectionPool.from_url(
                     redis_url,
-                    decode_responses=True,
+                    max_connections=50,
+                    health_check_interval=30,
                     socket_connect_timeout=5,
                     socket_timeout=5
                 )
+                self.client = redis.Redis(connection_pool=pool)
                 # Test connection
                 self.client.ping()
                 logger.info("✅ Connected to Redis")
@@ -48,7 +52,7 @@ class CacheClient:
             value = self.client.get(key)
             if value:
                 logger.debug(f"Cache HIT: {key}")
-                return json.loads(value)
+                return orjson.loads(value)
             logger.debug(f"Cache MISS: {key}")
             return None
         except Exception as e:
@@ -64,7 +68,7 @@ class CacheClient:
             self.client.setex(
                 key,
                 ttl,
-                json.dumps(value, default=str)
+                orjson.dumps(value, default=str)
             )
             logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
             return True
@@ -72,6 +76,17 @@ class CacheClient:
             logger.error(f"Cache set error: {str(e)}")
             return False
     
+    def incr(self, key: str) -> Optional[int]:
+        """Atomically increment an integer key; None when Redis is unavailable"""
+        if not self.client:
+            return None
+        
+        try:
+            return self.client.incr(key)
+        except Exception as e:
+            logger.error(f"Cache incr error: {str(e)}")
+            return None
+    
     def delete(self, key: str) -> bool:
         """Delete key from cache"""
         if not self.client:
@@ -91,10 +106,19 @@ class CacheClient:
             return False
         
         try:
-            keys = self.client.keys(pattern)
-            if keys:
-                self.client.delete(*keys)
-                logger.debug(f"Cache DELETE pattern: {pattern} ({len(keys)} keys)")
+            # SCAN rather than KEYS so a large keyspace doesn't block Redis, and
+            # UNLINK in batches so values are freed off Redis' main thread
+            deleted = 0
+            batch = []
+            for key in self.client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) == 500:
+                    deleted += self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += self.client.unlink(*batch)
+            if deleted:
+                logger.debug(f"Cache DELETE pattern: {pattern} ({deleted} keys)")
             return True
         except Exception as e:
             logger.error(f"Cache delete pattern error: {str(e)}")
@@ -3,16 +3,31 @@ RabbitMQ connection and publishing utilities
 """
 
 import pika
-import json
+import orjson
 import logging
-from typing import Dict, Any, Optional
-from tenacity import retry, stop_after_attempt, wait_exponential
-from pybreaker import CircuitBreaker
+import queue
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential_jitter
+from pybreaker import CircuitBreaker, CircuitBreakerError
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Most events the publisher thread sends in one publish_batch call
+PUBLISH_BATCH_SIZE = 100
+
+# Events not worth a broker fsync; published with delivery_mode=1
+TRANSIENT_ROUTING_KEYS = frozenset({"template.test"})
+
+
+def delivery_mode(routing_key: str, persistent: Optional[bool] = None) -> int:
+    """2 (persistent) unless the event is transient by argument or routing key"""
+    if persistent is None:
+        persistent = routing_key not in TRANSIENT_ROUTING_KEYS
+    return 2 if persistent else 1
+
 
 class RabbitMQClient:
     """RabbitMQ client with circuit breaker and retry logic"""
@@ -25,6 +40,13 @@ class RabbitMQClient:
             reset_timeout=60,
             name="rabbitmq_breaker"
         )
+        # Wrapped once here rather than per publish
+        self._publish = self.circuit_breaker(self._publish_raw)
+        # Events waiting for the publisher thread; once it runs, it is the only
+        # thread that touches the (not thread-safe) BlockingConnection
+        self._events = queue.Queue(maxsize=settings.event_queue_size)
+        self._publisher = None
+        self._stopping = threading.Event()
     
     def connect(self):
         """Establish connection to RabbitMQ"""
@@ -35,6 +57,12 @@ class RabbitMQClient:
             parameters = pika.URLParameters(rabbitmq_url)
             parameters.heartbeat = 600
             parameters.blocked_connection_timeout = 300
+            # pika retries the connect itself; only the publisher thread and
+            # startup connect, so these waits never land on a request
+            parameters.connection_attempts = 5
+            parameters.retry_delay = 0.5
+            parameters.socket_timeout = 2.0
+            parameters.stack_timeout = 5.0
             
             self.connection = pika.BlockingConnection(parameters)
             self.channel = self.connection.channel()
@@ -79,15 +107,41 @@ class RabbitMQClient:
         
         logger.info("✅ RabbitMQ exchanges and queues configured")
     
+    def _publish_raw(self, items: List[Tuple[str, bytes, Optional[str], int]]):
+        """Publish encoded (routing_key, body, correlation_id, delivery_mode) items; called through the breaker"""
+        if not self.connection or self.connection.is_closed:
+            self.connect()
+        
+        for routing_key, body, correlation_id, mode in items:
+            self.channel.basic_publish(
+                exchange='template.events',
+                routing_key=routing_key,
+                body=body,
+                properties=pika.BasicProperties(
+                    delivery_mode=mode,
+                    content_type='application/json',
+                    correlation_id=correlation_id or 'unknown'
+                )
+            )
+    
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
+        # Jittered so instances don't retry against a recovering broker in lockstep
+        wait=wait_exponential_jitter(initial=1, max=10, jitter=2),
+        # An open breaker fails fast; waiting out the backoff wouldn't close it
+        retry=retry_if_not_exception_type(CircuitBreakerError),
+        reraise=True
     )
+    def _publish_with_retry(self, items: List[Tuple[str, bytes, Optional[str], int]]):
+        """Publish through the breaker, retrying failures; raises the last error"""
+        self._publish(items)
+    
     def publish_event(
         self, 
         routing_key: str, 
         message: Dict[str, Any],
-        correlation_id: Optional[str] = None
+        correlation_id: Optional[str] = None,
+        persistent: Optional[bool] = None
     ) -> bool:
         """
         Publish event to RabbitMQ with circuit breaker and retry
@@ -96,38 +150,21 @@ class RabbitMQClient:
             routing_key: Routing key (e.g., 'template.created', 'template.updated')
             message: Message payload
             correlation_id: Correlation ID for tracing
+            persistent: Persist on the broker; defaults by routing key
             
         Returns:
             True if published successfully
         """
         try:
-            # Use circuit breaker
-            @self.circuit_breaker
-            def _publish():
-                if not self.connection or self.connection.is_closed:
-                    self.connect()
-                
-                properties = pika.BasicProperties(
-                    delivery_mode=2,  # Persistent
-                    content_type='application/json',
-                    correlation_id=correlation_id or 'unknown'
-                )
-                
-                self.channel.basic_publish(
-                    exchange='template.events',
-                    routing_key=routing_key,
-                    body=json.dumps(message),
-                    properties=properties
-                )
-                
-                logger.info(f"📤 Published event: {routing_key}", extra={
-                    "correlation_id": correlation_id,
-                    "routing_key": routing_key
-                })
-                
-                return True
+            # Serialized outside the retry so a retry doesn't encode again
+            body = orjson.dumps(message, default=str)
+            self._publish_with_retry([(routing_key, body, correlation_id, delivery_mode(routing_key, persistent))])
             
-            return _publish()
+            logger.info(f"📤 Published event: {routing_key}", extra={
+                "correlation_id": correlation_id,
+                "routing_key": routing_key
+            })
+            return True
         
         except Exception as e:
             logger.error(f"Failed to publish event: {str(e)}", extra={
@@ -136,8 +173,157 @@ class RabbitMQClient:
             })
             return False
     
+    def publish_batch(
+        self,
+        events: List[Tuple[str, Dict[str, Any], Optional[str]]]
+    ) -> int:
+        """
+        Publish several events with one connection check per attempt
+        
+        Retried like publish_event. A retry after a partial failure republishes
+        the whole batch, so consumers may see an event twice (delivery was
+        already at-least-once).
+        
+        Args:
+            events: (routing_key, message, correlation_id) tuples, published in order
+            
+        Returns:
+            Number of events published; 0 if the batch failed
+        """
+        if not events:
+            return 0
+        
+        try:
+            # Encoded once, outside the retry
+            items = [
+                (routing_key, orjson.dumps(message, default=str), correlation_id, delivery_mode(routing_key))
+                for routing_key, message, correlation_id in events
+            ]
+            self._publish_with_retry(items)
+            
+            logger.info(f"📤 Published {len(events)} events")
+            return len(events)
+        
+        except Exception as e:
+            logger.error(f"Failed to publish event batch: {str(e)}", extra={
+                "batch_size": len(events)
+            })
+            return 0
+    
+    @property
+    def publisher_running(self) -> bool:
+        """Whether the background publisher thread is draining the event queue"""
+        return self._publisher is not None and self._publisher.is_alive()
+    
+    def start_publisher(self):
+        """Start the background thread that publishes queued events"""
+        if self.publisher_running:
+            return
+        self._stopping.clear()
+        self._publisher = threading.Thread(
+            target=self._run_publisher,
+            name="rabbitmq-publisher",
+            daemon=True
+        )
+        self._publisher.start()
+        logger.info("✅ RabbitMQ publisher thread started")
+    
+    def stop_publisher(self, timeout: float = 5.0):
+        """
+        Publish what is already queued, then stop the publisher thread
+        
+        The thread closes the connection itself on exit. If it is still busy
+        (e.g. inside a connect) after `timeout`, it is left to finish and
+        close on its own rather than having another thread touch the
+        connection.
+        """
+        if not self.publisher_running:
+            return
+        self._stopping.set()
+        self._publisher.join(timeout)
+        if self._publisher.is_alive():
+            logger.warning("RabbitMQ publisher still busy after stop timeout; it closes the connection when it exits")
+            return
+        self._publisher = None
+    
+    def enqueue_event(
+        self,
+        routing_key: str,
+        message: Dict[str, Any],
+        correlation_id: Optional[str] = None
+    ) -> bool:
+        """
+        Hand an event to the publisher thread without waiting on the broker
+        
+        Publishes synchronously when the publisher thread isn't running but a
+        connection is open; never connects from the caller's thread.
+        
+        Args:
+            routing_key: Routing key (e.g., 'template.created', 'template.updated')
+            message: Message payload
+            correlation_id: Correlation ID for tracing
+            
+        Returns:
+            True if queued (or published), False if the event was dropped
+        """
+        if not self.publisher_running:
+            if self.connection and self.connection.is_open:
+                return self.publish_event(routing_key, message, correlation_id)
+            logger.warning(f"RabbitMQ not connected, dropping event: {routing_key}", extra={
+                "correlation_id": correlation_id,
+                "routing_key": routing_key
+            })
+            return False
+        
+        try:
+            self._events.put_nowait((routing_key, message, correlation_id))
+            return True
+        except queue.Full:
+            logger.warning(f"Event queue full, dropping event: {routing_key}", extra={
+                "correlation_id": correlation_id,
+                "routing_key": routing_key
+            })
+            return False
+    
+    def _run_publisher(self):
+        """Drain the event queue in batches until stopped, then close the connection"""
+        try:
+            self._drain_events()
+        finally:
+            # Closed from this thread, the connection's only user while it runs
+            self._close_connection()
+    
+    def _drain_events(self):
+        """Publish queued events in batches until stopped and the queue is empty"""
+        while not (self._stopping.is_set() and self._events.empty()):
+            try:
+                batch = [self._events.get(timeout=1)]
+            except queue.Empty:
+                # Idle: service heartbeats so the broker keeps the connection
+                try:
+                    if self.connection and self.connection.is_open:
+                        self.connection.process_data_events(time_limit=0)
+                except Exception as e:
+                    logger.warning(f"RabbitMQ heartbeat failed: {str(e)}")
+                continue
+            
+            while len(batch) < PUBLISH_BATCH_SIZE:
+                try:
+                    batch.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+            
+            self.publish_batch(batch)
+    
     def close(self):
-        """Close RabbitMQ connection"""
+        """Close RabbitMQ connection, unless the publisher thread still owns it"""
+        if self.publisher_running and threading.current_thread() is not self._publisher:
+            logger.warning("RabbitMQ publisher thread still running; leaving the connection for it to close")
+            return
+        self._close_connection()
+    
+    def _close_connection(self):
+        """Close the channel and connection if open"""
         try:
             if self.channel and self.channel.is_open:
                 self.channel.close()
@@ -153,7 +339,5 @@ rabbitmq_client = RabbitMQClient()
 
 
 def get_rabbitmq_client() -> RabbitMQClient:
-    """Get or create RabbitMQ client"""
-    if not rabbitmq_client.connection or rabbitmq_client.connection.is_closed:
-        rabbitmq_client.connect()
+    """Get RabbitMQ client; connected at startup and kept up by the publisher thread"""
     return rabbitmq_client
\ No newline at end of file
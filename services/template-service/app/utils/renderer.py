@@ -2,27 +2,117 @@
 Template rendering utility using Jinja2
 """
 
-from jinja2 import Environment, BaseLoader, TemplateError, TemplateSyntaxError
+from cachetools import LRUCache
+from jinja2 import Environment, BaseLoader, StrictUndefined, Template, TemplateError, TemplateSyntaxError, meta, nodes
+from functools import lru_cache
+from threading import Lock
+import hashlib
+import orjson
 import re
-from typing import Dict, List, Tuple, Any
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+# One environment per process so compiled templates can be shared between renderers
+_env = Environment(
+    loader=BaseLoader(),
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    undefined=StrictUndefined
+)
+
+
+# Jinja2 variable syntax: {{ variable }}; only used for sources Jinja can't parse
+VARIABLE_PATTERN = re.compile(r'\{\{\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\}\}')
+
+
+@lru_cache(maxsize=1024)
+def parse_template(template_string: str) -> nodes.Template:
+    """Parse a template source into Jinja's AST once per process"""
+    return _env.parse(template_string)
+
+
+def optional_variables(ast: nodes.Template) -> FrozenSet[str]:
+    """
+    Names a template can render without
+    
+    A name is optional when it is tested with `is defined` / `is undefined`
+    anywhere, or when every reference to it is the direct operand of the
+    `default` filter. StrictUndefined lets both render when the name is absent.
+    """
+    tested = set()
+    defaulted = set()
+    for node in ast.find_all((nodes.Filter, nodes.Test)):
+        if not isinstance(node.node, nodes.Name):
+            continue
+        if isinstance(node, nodes.Test) and node.name in ("defined", "undefined"):
+            tested.add(node.node.name)
+        elif isinstance(node, nodes.Filter) and node.name in ("default", "d"):
+            defaulted.add(id(node.node))
+    
+    unguarded = {
+        name.name for name in ast.find_all(nodes.Name)
+        if name.ctx == "load" and id(name) not in defaulted
+    }
+    defaulted_names = {
+        name.name for name in ast.find_all(nodes.Name) if id(name) in defaulted
+    }
+    return frozenset(tested | (defaulted_names - unguarded))
+
+
+@lru_cache(maxsize=1024)
+def template_variables(template_string: str) -> FrozenSet[str]:
+    """
+    Unique variable names a template needs from its context
+    
+    Taken from the parsed AST, so names used in tags, attribute lookups and
+    filters count and loop/set targets don't; names the template guards with
+    `default` or `is defined` are left out (see optional_variables). A source
+    with a syntax error falls back to a scan for plain {{ name }}
+    placeholders; rendering it reports the error.
+    """
+    try:
+        ast = parse_template(template_string)
+    except TemplateSyntaxError:
+        return frozenset(VARIABLE_PATTERN.findall(template_string))
+    return frozenset(meta.find_undeclared_variables(ast)) - optional_variables(ast)
+
+
+@lru_cache(maxsize=1024)
+def compile_template(template_string: str) -> Template:
+    """
+    Compile a template once per process
+    
+    Built from parse_template's cached AST (what from_string does after
+    parsing), so the source is parsed once whether it is first rendered or
+    scanned for variables. Keyed by the source text, so an edited template
+    compiles fresh and the old entry simply ages out of the LRU.
+    """
+    code = _env.compile(parse_template(template_string))
+    return _env.template_class.from_code(_env, code, _env.make_globals(None))
+
+
+# Rendered output by (source, data digest). Keyed by the source text, so an
+# edited template can never be served stale. LRUCache isn't thread-safe and
+# sync endpoints render on a threadpool.
+_rendered_lock = Lock()
+_rendered: LRUCache = LRUCache(maxsize=2048)
+
+
+def data_digest(data: Dict[str, Any]) -> bytes:
+    """Order-independent digest of render data"""
+    canonical = orjson.dumps(data, option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
 
 class TemplateRenderer:
     """Handles template variable substitution using Jinja2"""
     
     def __init__(self):
-        """Initialize Jinja2 environment"""
-        from jinja2 import StrictUndefined
-        self.env = Environment(
-            loader=BaseLoader(),
-            autoescape=False,
-            trim_blocks=True,
-            lstrip_blocks=True,
-            undefined=StrictUndefined
-        )
+        """Use the shared Jinja2 environment"""
+        self.env = _env
     
     def render(self, template_string: str, data: Dict[str, Any]) -> str:
         """
@@ -39,7 +129,7 @@ class TemplateRenderer:
             ValueError: If template rendering fails
         """
         try:
-            template = self.env.from_string(template_string)
+            template = compile_template(template_string)
             rendered = template.render(**data)
             logger.debug(f"Template rendered successfully with {len(data)} variables")
             return rendered
@@ -56,6 +146,50 @@ class TemplateRenderer:
             logger.error(error_msg)
             raise ValueError(error_msg)
     
+    def warm(self, template_strings: Iterable[Optional[str]]) -> int:
+        """
+        Compile and scan templates ahead of their first render
+        
+        Args:
+            template_strings: Template sources; None entries are skipped
+            
+        Returns:
+            Number of templates compiled
+        """
+        compiled = 0
+        for template_string in template_strings:
+            if not template_string:
+                continue
+            try:
+                compile_template(template_string)
+                template_variables(template_string)
+                compiled += 1
+            except TemplateError as e:
+                # Surfaces as a ValueError when the template is rendered
+                logger.warning(f"Skipping template that fails to compile: {str(e)}")
+        return compiled
+    
+    def render_cached(self, template_string: str, data: Dict[str, Any]) -> str:
+        """
+        Render, reusing the output of an earlier render with identical data
+        
+        Same contract as render(); worth it where the same data repeats
+        (resends, retries, shared payloads).
+        """
+        try:
+            key = (template_string, data_digest(data))
+        except TypeError:
+            # Data orjson can't encode even via str() keys; render uncached
+            return self.render(template_string, data)
+        
+        with _rendered_lock:
+            rendered = _rendered.get(key)
+        if rendered is None:
+            rendered = self.render(template_string, data)
+            with _rendered_lock:
+                _rendered[key] = rendered
+        return rendered
+    
     def extract_variables(self, template_string: str) -> List[str]:
         """
         Extract variable names from template
@@ -67,10 +201,8 @@ class TemplateRenderer:
             List of unique variable names
         """
         try:
-            # Match Jinja2 variable syntax: {{ variable }}
-            pattern = r'\{\{\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\}\}'
-            variables = re.findall(pattern, template_string)
-            unique_vars = list(set(variables))
+            # Fresh list each call; callers extend it
+            unique_vars = list(template_variables(template_string))
             logger.debug(f"Extracted {len(unique_vars)} unique variables from template")
             return unique_vars
         except Exception as e:
@@ -118,9 +250,12 @@ class TemplateRenderer:
         Returns:
             Dictionary with rendered content and metadata
         """
-        is_valid, missing = self.validate_variables(template_string, data)
+        # One variable lookup serves both the check and variables_used
+        required = self.extract_variables(template_string)
+        missing = [v for v in required if v not in data]
         
-        if not is_valid:
+        if missing:
+            logger.warning(f"Missing variables: {missing}")
             return {
                 "success": False,
                 "error": f"Missing required variables: {', '.join(missing)}",
@@ -132,10 +267,19 @@ class TemplateRenderer:
             return {
                 "success": True,
                 "rendered": rendered,
-                "variables_used": self.extract_variables(template_string)
+                "variables_used": required
             }
         except ValueError as e:
             return {
                 "success": False,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+
+
+# Global renderer
+renderer = TemplateRenderer()
+
+
+def get_renderer() -> TemplateRenderer:
+    """Get template renderer"""
+    return renderer
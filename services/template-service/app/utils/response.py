@@ -2,8 +2,26 @@
 Standardized API response helper
 """
 
+from functools import lru_cache
 from typing import Optional, Any
-from app.schemas import ApiResponse, PaginationMeta
+
+
+@lru_cache(maxsize=512)
+def pagination_meta(total: int, limit: int, page: int) -> dict:
+    """
+    PaginationMeta-shaped dict, built once per (total, limit, page)
+    
+    The returned dict is shared between responses; treat it as read-only.
+    """
+    total_pages = (total + limit - 1) // limit if total > 0 else 0
+    return {
+        "total": total,
+        "limit": limit,
+        "page": page,
+        "total_pages": total_pages,
+        "has_next": page < total_pages,
+        "has_previous": page > 1
+    }
 
 
 def create_response(
@@ -30,27 +48,15 @@ def create_response(
     Returns:
         Standardized response dictionary
     """
-    # Calculate pagination
-    total_pages = (total + limit - 1) // limit if total > 0 else 0
-    
-    meta = PaginationMeta(
-        total=total,
-        limit=limit,
-        page=page,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_previous=page > 1
-    )
-    
-    response = ApiResponse(
-        success=success,
-        data=data,
-        error=error,
-        message=message,
-        meta=meta
-    )
-    
-    return response.model_dump()
+    # Same shape as ApiResponse, built directly: dumping the model would deep-copy
+    # `data`, doubling peak memory for a full page of templates
+    return {
+        "success": success,
+        "data": data,
+        "error": error,
+        "message": message,
+        "meta": pagination_meta(total, limit, page)
+    }
 
 
 def success_response(
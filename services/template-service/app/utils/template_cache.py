@@ -0,0 +1,45 @@
+"""
+In-process template cache
+
+Per-worker TTL LRU in front of the template lookups. Values are plain dicts
+detached from any DB session, stored with the template's generation: a
+counter in Redis every write bumps. A read passes the current generation
+and an entry from an older one is a miss, so a write in any worker is seen
+by all of them on their next read. Without Redis the generation is constant
+and other workers pick changes up within the TTL.
+"""
+
+from cachetools import TTLCache
+from threading import Lock
+from typing import Optional, Dict, Any
+
+# Sync endpoints run on a threadpool and TTLCache is not thread-safe
+_lock = Lock()
+_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+
+
+def get(template_id: str, generation: int) -> Optional[Dict[str, Any]]:
+    """Cached template dict for this generation, or None on a miss"""
+    with _lock:
+        entry = _cache.get(template_id)
+    if entry is None or entry[0] != generation:
+        return None
+    return entry[1]
+
+
+def put(template_id: str, generation: int, value: Dict[str, Any]) -> None:
+    """Cache a template dict; callers must not mutate it afterwards"""
+    with _lock:
+        _cache[template_id] = (generation, value)
+
+
+def invalidate(template_id: str) -> None:
+    """Drop a template after it was written"""
+    with _lock:
+        _cache.pop(template_id, None)
+
+
+def clear() -> None:
+    """Drop everything"""
+    with _lock:
+        _cache.clear()
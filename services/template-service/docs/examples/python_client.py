@@ -1,21 +1,48 @@
 """
 Python client example for Template Service integration
 """
-import requests
-from typing import Dict, Optional
+import asyncio
+import httpx
+from typing import Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive pool shared by every request a client makes
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+DEFAULT_TIMEOUT = httpx.Timeout(5.0)
+
+
+def _render_result(response: httpx.Response) -> Dict:
+    """Unwrap a render response envelope"""
+    response.raise_for_status()
+    result = response.json()
+    
+    if not result["success"]:
+        raise ValueError(f"Template render failed: {result.get('error')}")
+    
+    return result["data"]
+
 
 class TemplateServiceClient:
     """Client for interacting with Template Service"""
     
-    def __init__(self, base_url: str = "http://template-service:3004"):
+    def __init__(self, base_url: str = "http://template-service:3004", http2: bool = False):
+        """
+        Args:
+            base_url: Service root URL
+            http2: Negotiate HTTP/2 (needs `pip install httpx[http2]` and a
+                TLS-terminating proxy in front of the service; uvicorn itself
+                speaks HTTP/1.1)
+        """
         self.base_url = base_url
-        self.api_url = f"{base_url}/api/v1"
-        self.session = requests.Session()
-        self.session.headers.update({"Content-Type": "application/json"})
+        self.client = httpx.Client(
+            base_url=f"{base_url}/api/v1",
+            headers={"Content-Type": "application/json"},
+            timeout=DEFAULT_TIMEOUT,
+            limits=DEFAULT_LIMITS,
+            http2=http2
+        )
     
     def render_template(
         self, 
@@ -35,29 +62,23 @@ class TemplateServiceClient:
             Rendered template with subject and body
             
         Raises:
-            requests.HTTPError: If request fails
+            httpx.HTTPError: If request fails
             ValueError: If template render fails
         """
         try:
-            response = self.session.post(
-                f"{self.api_url}/templates/{template_id}/render",
+            response = self.client.post(
+                f"/templates/{template_id}/render",
                 json={"data": data, "language_code": language_code}
             )
-            response.raise_for_status()
-            result = response.json()
-            
-            if not result["success"]:
-                raise ValueError(f"Template render failed: {result.get('error')}")
-            
-            return result["data"]
+            return _render_result(response)
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to render template {template_id}: {e}")
             raise
     
     def get_template(self, template_id: str) -> Dict:
         """Get template details"""
-        response = self.session.get(f"{self.api_url}/templates/{template_id}")
+        response = self.client.get(f"/templates/{template_id}")
         response.raise_for_status()
         result = response.json()
         
@@ -77,18 +98,77 @@ class TemplateServiceClient:
         if template_type:
             params["type"] = template_type
         
-        response = self.session.get(f"{self.api_url}/templates", params=params)
+        response = self.client.get("/templates", params=params)
         response.raise_for_status()
         return response.json()
     
     def health_check(self) -> bool:
         """Check if service is healthy"""
         try:
-            response = self.session.get(f"{self.base_url}/health", timeout=5)
+            response = self.client.get(f"{self.base_url}/health")
             health = response.json()
             return health["data"]["status"] == "healthy"
         except:
             return False
+    
+    def close(self):
+        """Close pooled connections"""
+        self.client.close()
+
+
+class AsyncTemplateServiceClient:
+    """Asyncio client for callers that render many templates concurrently"""
+    
+    def __init__(self, base_url: str = "http://template-service:3004", http2: bool = False):
+        self.base_url = base_url
+        self.client = httpx.AsyncClient(
+            base_url=f"{base_url}/api/v1",
+            headers={"Content-Type": "application/json"},
+            timeout=DEFAULT_TIMEOUT,
+            limits=DEFAULT_LIMITS,
+            http2=http2
+        )
+    
+    async def render_template(
+        self,
+        template_id: str,
+        data: Dict,
+        language_code: str = "en"
+    ) -> Dict:
+        """Render a template with provided data (see TemplateServiceClient.render_template)"""
+        try:
+            response = await self.client.post(
+                f"/templates/{template_id}/render",
+                json={"data": data, "language_code": language_code}
+            )
+            return _render_result(response)
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to render template {template_id}: {e}")
+            raise
+    
+    async def render_many(
+        self,
+        renders: List[Tuple[str, Dict, str]]
+    ) -> List[Dict]:
+        """
+        Render several templates concurrently
+        
+        Args:
+            renders: (template_id, data, language_code) tuples
+            
+        Returns:
+            Rendered templates in the same order as `renders`
+        """
+        # All requests are in flight at once over the pooled connections,
+        # instead of one round-trip after another
+        return await asyncio.gather(
+            *(self.render_template(*render) for render in renders)
+        )
+    
+    async def aclose(self):
+        """Close pooled connections"""
+        await self.client.aclose()
 
 
 # Example usage
@@ -115,16 +195,26 @@ if __name__ == "__main__":
     print("Body:", rendered["body"])
     print("Variables used:", rendered["variables_used"])
     
-    # Render in Spanish
-    rendered_es = client.render_template(
-        "welcome_email",
-        {
-            "name": "Juan Pérez",
-            "company_name": "Acme Corp",
-            "verification_link": "https://example.com/verify/xyz789"
-        },
-        language_code="es"
-    )
+    # Render several at once with the async client
+    async def render_languages():
+        async_client = AsyncTemplateServiceClient("http://localhost:3004")
+        try:
+            return await async_client.render_many([
+                ("welcome_email", {
+                    "name": "John Doe",
+                    "company_name": "Acme Corp",
+                    "verification_link": "https://example.com/verify/abc123"
+                }, "en"),
+                ("welcome_email", {
+                    "name": "Juan Pérez",
+                    "company_name": "Acme Corp",
+                    "verification_link": "https://example.com/verify/xyz789"
+                }, "es"),
+            ])
+        finally:
+            await async_client.aclose()
+    
+    rendered_en, rendered_es = asyncio.run(render_languages())
     
     print("\nSpanish version:")
     print("Subject:", rendered_es["subject"])
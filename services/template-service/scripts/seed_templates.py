@@ -10,13 +10,32 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import orjson
 import requests
-import json
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Tuple
 
 BASE_URL = os.getenv("TEMPLATE_SERVICE_URL", "http://localhost:3004")
 API_URL = f"{BASE_URL}/api/v1/templates"
 
+# Concurrent creates; also the keep-alive pool size so each worker keeps a connection
+SEED_WORKERS = 8
+
+
+def create_session() -> requests.Session:
+    """HTTP session that keeps connections to the service open between requests"""
+    session = requests.Session()
+    # Bodies are posted pre-encoded, so the content type is set once here
+    session.headers["Content-Type"] = "application/json"
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SEED_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+session = create_session()
+
 
 templates: List[Dict] = [
     {
@@ -207,6 +226,24 @@ The {{company_name}} Team""",
 ]
 
 
+def create_template(template: Dict) -> Tuple[str, str, str]:
+    """POST one template; returns (template_id, outcome, detail)"""
+    template_id = template["template_id"]
+    body = orjson.dumps(template)
+    try:
+        response = session.post(API_URL, data=body, timeout=10)
+    except requests.exceptions.ConnectionError:
+        return template_id, "connection_error", ""
+    except Exception as e:
+        return template_id, "error", str(e)
+    
+    if response.status_code == 201:
+        return template_id, "created", ""
+    if response.status_code == 400 and "already exists" in response.text:
+        return template_id, "skipped", ""
+    return template_id, "failed", f"{response.status_code}\n   Response: {response.text[:100]}"
+
+
 def seed_templates():
     """Seed all templates"""
     print("=" * 50)
@@ -218,26 +255,26 @@ def seed_templates():
     success_count = 0
     error_count = 0
     
-    for template in templates:
-        try:
-            response = requests.post(API_URL, json=template, timeout=10)
-            
-            if response.status_code == 201:
-                print(f"✅ Created: {template['template_id']}")
-                success_count += 1
-            elif response.status_code == 400 and "already exists" in response.text:
-                print(f"⚠️  Skipped (exists): {template['template_id']}")
-            else:
-                print(f"❌ Failed: {template['template_id']} - {response.status_code}")
-                print(f"   Response: {response.text[:100]}")
-                error_count += 1
-        
-        except requests.exceptions.ConnectionError:
-            print(f"❌ Connection Error: Could not connect to {BASE_URL}")
-            print("   Make sure the service is running!")
-            return
-        except Exception as e:
-            print(f"❌ Error creating {template['template_id']}: {str(e)}")
+    with ThreadPoolExecutor(max_workers=SEED_WORKERS) as executor:
+        # map keeps results in template order for the report below
+        results = list(executor.map(create_template, templates))
+    
+    if any(outcome == "connection_error" for _, outcome, _ in results):
+        print(f"❌ Connection Error: Could not connect to {BASE_URL}")
+        print("   Make sure the service is running!")
+        return
+    
+    for template_id, outcome, detail in results:
+        if outcome == "created":
+            print(f"✅ Created: {template_id}")
+            success_count += 1
+        elif outcome == "skipped":
+            print(f"⚠️  Skipped (exists): {template_id}")
+        elif outcome == "failed":
+            print(f"❌ Failed: {template_id} - {detail}")
+            error_count += 1
+        else:
+            print(f"❌ Error creating {template_id}: {detail}")
             error_count += 1
     
     print()
@@ -298,9 +335,9 @@ El equipo de {{company_name}}"""
     for translation in translations:
         template_id = translation.pop("template_id")
         try:
-            response = requests.post(
+            response = session.post(
                 f"{API_URL}/{template_id}/translations",
-                json=translation,
+                data=orjson.dumps(translation),
                 timeout=10
             )
             
@@ -10,15 +10,18 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.utils.rabbitmq import get_rabbitmq_client
+import pytest
 import time
 
+@pytest.mark.integration
 def test_rabbitmq():
     """Test RabbitMQ connection and event publishing"""
     print("🧪 Testing RabbitMQ Connection...")
     print("-" * 50)
     
-    # Get RabbitMQ client
+    # Get RabbitMQ client (outside the service nothing has connected it yet)
     client = get_rabbitmq_client()
+    client.connect()
     
     # Test connection
     if client.connection and not client.connection.is_closed:
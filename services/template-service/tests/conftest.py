@@ -2,17 +2,23 @@
 Pytest configuration and fixtures
 """
 
+import uuid
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
 from app.database import Base, get_db
 from app.models import Template, TemplateVersion, TemplateTranslation
+from app.utils import template_cache
+from app.schemas import TemplateCreate, TemplateResponse
+from app.services.template_service import TemplateService, collect_variables
 
-# Use in-memory SQLite for testing
+# Use in-memory SQLite for testing; private to the process, so each xdist
+# worker gets its own database
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 
 engine = create_engine(
@@ -24,27 +30,59 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-@pytest.fixture(scope="function")
-def db_session():
-    """Create a fresh database session for each test"""
+# pysqlite manages transactions itself and breaks SAVEPOINT; hand BEGIN back
+# to SQLAlchemy so each test can run inside a rolled-back outer transaction
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def tables():
+    """Create the schema once for the whole test run"""
     Base.metadata.create_all(bind=engine)
-    session = TestingSessionLocal()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session(tables):
+    """
+    Session whose work is rolled back after each test
+    
+    Runs inside an outer transaction; the service's commits and rollbacks
+    only release or roll back SAVEPOINTs within it.
+    """
+    template_cache.clear()
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
     try:
         yield session
     finally:
         session.close()
-        Base.metadata.drop_all(bind=engine)
+        transaction.rollback()
+        connection.close()
 
 
-@pytest.fixture(scope="function")
-def client(db_session):
-    """Create a test client with database session override"""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
-    
+# Session the running test's requests use; set by the `client` fixture
+_request_session = {}
+
+
+def override_get_db():
+    """get_db override handing requests the current test's db_session"""
+    yield _request_session["db"]
+
+
+@pytest.fixture(scope="session")
+def app_client(tables):
+    """One TestClient (and app startup) for the whole run"""
+    # Set before startup: the lifespan skips DB/broker setup when overrides exist
     app.dependency_overrides[get_db] = override_get_db
     
     with TestClient(app) as test_client:
@@ -53,24 +91,116 @@ def client(db_session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="function")
+def client(app_client, db_session):
+    """Test client whose requests run on this test's rolled-back db_session"""
+    _request_session["db"] = db_session
+    try:
+        yield app_client
+    finally:
+        _request_session.pop("db", None)
+
+
+SAMPLE_TEMPLATE = {
+    "template_id": "test_welcome",
+    "name": "Test Welcome Email",
+    "description": "Test template for welcome emails",
+    "type": "email",
+    "category": "onboarding",
+    "subject": "Welcome {{name}}!",
+    "body": "Hi {{name}}, welcome to {{company_name}}!",
+    "language_code": "en"
+}
+
+
 @pytest.fixture
 def sample_template_data():
-    """Sample template data for testing"""
-    return {
-        "template_id": "test_welcome",
-        "name": "Test Welcome Email",
-        "description": "Test template for welcome emails",
-        "type": "email",
-        "category": "onboarding",
-        "subject": "Welcome {{name}}!",
-        "body": "Hi {{name}}, welcome to {{company_name}}!",
-        "language_code": "en"
-    }
+    """Sample template data for testing; a fresh dict tests may modify"""
+    return dict(SAMPLE_TEMPLATE)
+
+
+@pytest.fixture(scope="session")
+def sample_template_model():
+    """
+    SAMPLE_TEMPLATE validated once for the run
+    
+    Derive variants with model_copy(update=...), which skips re-validation.
+    """
+    return TemplateCreate(**SAMPLE_TEMPLATE)
+
+
+@pytest.fixture(scope="session")
+def template_factory():
+    """
+    Build validated TemplateCreate models from a minimal base
+    
+    template_factory("welcome", body="Hi {{name}}") overrides any base field.
+    """
+    base = {"name": "Test", "type": "email", "body": "Test", "language_code": "en"}
+    
+    def make(template_id, **overrides):
+        return TemplateCreate(**{**base, **overrides, "template_id": template_id})
+    
+    return make
+
+
+@pytest.fixture
+def seed_templates(db_session, sample_template_data):
+    """
+    Insert templates straight into db_session, skipping the API
+    
+    For setup data only; each spec overrides fields of sample_template_data
+    and gets a current 1.0.0 version and a translation like a POST would.
+    """
+    def seed(specs):
+        rows = []
+        for spec in specs:
+            data = {**sample_template_data, **spec}
+            template = Template(
+                id=uuid.uuid4(),
+                template_id=data["template_id"],
+                name=data["name"],
+                description=data["description"],
+                type=data["type"],
+                category=data["category"],
+            )
+            rows.extend([
+                template,
+                TemplateVersion(
+                    template_id=template.id,
+                    version="1.0.0",
+                    subject=data["subject"],
+                    body=data["body"],
+                    variables=collect_variables(data["body"], data["subject"]),
+                    is_current=True,
+                    template_metadata={"initial_version": True}
+                ),
+                TemplateTranslation(
+                    template_id=template.id,
+                    language_code=data["language_code"],
+                    subject=data["subject"],
+                    body=data["body"]
+                ),
+            ])
+        db_session.add_all(rows)
+        db_session.flush()
+    
+    return seed
 
 
 @pytest.fixture
-def created_template(client, sample_template_data):
-    """Create a template and return the response"""
-    response = client.post("/api/v1/templates", json=sample_template_data)
-    assert response.status_code == 201
-    return response.json()["data"]
\ No newline at end of file
+def created_template(db_session, sample_template_model):
+    """Create a template through the service and return it as the API would"""
+    template, current_version = TemplateService(db_session).create_template(sample_template_model)
+    return TemplateResponse(
+        id=template.id,
+        template_id=template.template_id,
+        name=template.name,
+        description=template.description,
+        type=template.type,
+        category=template.category,
+        is_active=template.is_active,
+        created_at=template.created_at,
+        updated_at=template.updated_at,
+        current_version=current_version
+    ).model_dump(mode="json")
\ No newline at end of file
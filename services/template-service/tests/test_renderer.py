@@ -3,34 +3,65 @@ Tests for template renderer
 """
 
 import pytest
-from app.utils.renderer import TemplateRenderer
-
-
-def test_render_simple_template():
-    """Test rendering a simple template"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}!"
-    data = {"name": "John"}
-    
-    result = renderer.render(template, data)
-    
-    assert result == "Hello John!"
-
-
-def test_render_multiple_variables():
-    """Test rendering template with multiple variables"""
-    renderer = TemplateRenderer()
-    template = "Hi {{name}}, welcome to {{company}}!"
-    data = {"name": "Jane", "company": "Acme Corp"}
+from app.utils.renderer import TemplateRenderer, compile_template, parse_template
+
+
+@pytest.fixture(scope="session")
+def renderer():
+    """One renderer for the module; it holds no per-test state"""
+    return TemplateRenderer()
+
+
+@pytest.mark.parametrize("template,data,expected", [
+    pytest.param("Hello {{name}}!", {"name": "John"}, "Hello John!", id="simple"),
+    pytest.param(
+        "Hi {{name}}, welcome to {{company}}!", {"name": "Jane", "company": "Acme Corp"},
+        "Hi Jane, welcome to Acme Corp!", id="multiple_variables"
+    ),
+    pytest.param("Hello {{name}}!", {"name": "José García"}, "Hello José García!", id="special_characters"),
+    pytest.param("Your balance is ${{balance}}", {"balance": 1234.56}, "Your balance is $1234.56", id="number"),
+    pytest.param("Active: {{is_active}}", {"is_active": True}, "Active: True", id="boolean"),
+    pytest.param(
+        "Hello {{first_name}} {{last_name}}!", {"first_name": "John", "last_name": "Doe"},
+        "Hello John Doe!", id="underscores"
+    ),
+    pytest.param("Code: {{code123}}", {"code123": "ABC"}, "Code: ABC", id="digits_in_name"),
+    pytest.param("", {}, "", id="empty"),
+    pytest.param("This is a static message.", {}, "This is a static message.", id="no_variables"),
+    pytest.param(
+        "Hello {{name}}!", {"name": "John", "extra": "data", "more": "stuff"},
+        "Hello John!", id="extra_variables"
+    ),
+])
+def test_render(renderer, template, data, expected):
+    """Rendering substitutes the provided values"""
+    assert renderer.render(template, data) == expected
+
+
+@pytest.mark.parametrize("template,expected", [
+    pytest.param("Hello {{name}}, your email is {{email}}", ["email", "name"], id="simple"),
+    pytest.param("Hi {{name}}, {{name}} is great!", ["name"], id="duplicates"),
+    pytest.param(
+        """
+    Dear {{first_name}} {{last_name}},
     
-    result = renderer.render(template, data)
+    Your order #{{order_id}} totaling ${{amount}} has been confirmed.
     
-    assert result == "Hi Jane, welcome to Acme Corp!"
-
-
-def test_render_multiline_template():
+    Email: {{email}}
+    Phone: {{phone}}
+    """,
+        ["amount", "email", "first_name", "last_name", "order_id", "phone"],
+        id="complex"
+    ),
+    pytest.param("", [], id="empty"),
+])
+def test_extract_variables(renderer, template, expected):
+    """Each variable is reported once"""
+    assert sorted(renderer.extract_variables(template)) == expected
+
+
+def test_render_multiline_template(renderer):
     """Test rendering multiline template"""
-    renderer = TemplateRenderer()
     template = """Hi {{name}},
 
 Welcome to {{company}}!
@@ -46,103 +77,46 @@ The Team"""
     assert "Welcome to" in result
 
 
-def test_extract_variables():
-    """Test extracting variables from template"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}, your email is {{email}}"
-    
-    variables = renderer.extract_variables(template)
-    
-    assert set(variables) == {"name", "email"}
-
-
-def test_extract_variables_with_duplicates():
-    """Test extracting variables removes duplicates"""
-    renderer = TemplateRenderer()
-    template = "Hi {{name}}, {{name}} is great!"
+def test_extract_variables_from_tags_and_attributes(renderer):
+    """Variables in tags, attribute lookups and filters are found; loop targets are not"""
+    template = "{% if vip %}Dear {{ user.name | title }}{% endif %}{% for item in items %}{{ item }}{% endfor %}"
     
     variables = renderer.extract_variables(template)
     
-    assert variables == ["name"]
-
-
-def test_extract_variables_complex():
-    """Test extracting variables from complex template"""
-    renderer = TemplateRenderer()
-    template = """
-    Dear {{first_name}} {{last_name}},
-    
-    Your order #{{order_id}} totaling ${{amount}} has been confirmed.
-    
-    Email: {{email}}
-    Phone: {{phone}}
-    """
-    
-    variables = renderer.extract_variables(template)
-    
-    assert set(variables) == {"first_name", "last_name", "order_id", "amount", "email", "phone"}
-
-
-def test_validate_variables_success():
-    """Test variable validation with all variables provided"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}!"
-    data = {"name": "John"}
-    
-    is_valid, missing = renderer.validate_variables(template, data)
-    
-    assert is_valid is True
-    assert missing == []
-
-
-def test_validate_variables_missing():
-    """Test variable validation with missing variables"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}, email: {{email}}!"
-    data = {"name": "John"}
-    
+    assert set(variables) == {"vip", "user", "items"}
+
+
+@pytest.mark.parametrize("template,data,expected_valid,expected_missing", [
+    pytest.param("Hello {{name}}!", {"name": "John"}, True, [], id="all_provided"),
+    pytest.param("Hello {{name}}, email: {{email}}!", {"name": "John"}, False, ["email"], id="one_missing"),
+    pytest.param(
+        "{{greeting}} {{name}}, your code is {{code}}", {"name": "Alice"},
+        False, ["code", "greeting"], id="several_missing"
+    ),
+    pytest.param("Hi {{ name | default('there') }}", {}, True, [], id="default_filter"),
+    pytest.param("{% if name is defined %}Hi {{ name }}{% endif %}", {}, True, [], id="defined_test"),
+    pytest.param("{{ name | default('there') }} {{ name }}", {}, False, ["name"], id="default_and_plain"),
+])
+def test_validate_variables(renderer, template, data, expected_valid, expected_missing):
+    """Validation reports exactly the variables without values"""
     is_valid, missing = renderer.validate_variables(template, data)
     
-    assert is_valid is False
-    assert "email" in missing
+    assert is_valid is expected_valid
+    assert sorted(missing) == expected_missing
 
 
-def test_validate_variables_multiple_missing():
-    """Test validation with multiple missing variables"""
-    renderer = TemplateRenderer()
-    template = "{{greeting}} {{name}}, your code is {{code}}"
-    data = {"name": "Alice"}
-    
-    is_valid, missing = renderer.validate_variables(template, data)
-    
-    assert is_valid is False
-    assert set(missing) == {"greeting", "code"}
-
-
-def test_render_with_missing_variable():
-    """Test rendering fails with missing variable"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}!"
-    data = {}
-    
+@pytest.mark.parametrize("template,data", [
+    pytest.param("Hello {{name}}!", {}, id="missing_variable"),
+    pytest.param("Hello {% if %}", {}, id="syntax_error"),
+])
+def test_render_invalid(renderer, template, data):
+    """Render failures surface as ValueError"""
     with pytest.raises(ValueError):
         renderer.render(template, data)
 
 
-def test_render_with_extra_variables():
-    """Test rendering succeeds with extra variables"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}!"
-    data = {"name": "John", "extra": "data", "more": "stuff"}
-    
-    result = renderer.render(template, data)
-    
-    assert result == "Hello John!"
-
-
-def test_render_complex_template():
+def test_render_complex_template(renderer):
     """Test rendering complex multi-line template"""
-    renderer = TemplateRenderer()
     template = """
     Hi {{name}},
     
@@ -169,113 +143,67 @@ def test_render_complex_template():
     assert "Item 1" in result
 
 
-def test_render_with_special_characters():
-    """Test rendering with special characters in data"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}!"
-    data = {"name": "José García"}
-    
-    result = renderer.render(template, data)
-    
-    assert result == "Hello José García!"
-
-
-def test_render_with_numbers():
-    """Test rendering with numeric values"""
-    renderer = TemplateRenderer()
-    template = "Your balance is ${{balance}}"
-    data = {"balance": 1234.56}
-    
-    result = renderer.render(template, data)
-    
-    assert "1234.56" in result
-
-
-def test_render_with_boolean():
-    """Test rendering with boolean values"""
-    renderer = TemplateRenderer()
-    template = "Active: {{is_active}}"
-    data = {"is_active": True}
-    
-    result = renderer.render(template, data)
-    
-    assert "True" in result
-
-
-def test_preview_render_success():
-    """Test preview render with valid data"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}}!"
-    data = {"name": "John"}
-    
-    result = renderer.preview_render(template, data)
-    
-    assert result["success"] is True
-    assert result["rendered"] == "Hello John!"
-    assert "name" in result["variables_used"]
-
-
-def test_preview_render_missing_variables():
-    """Test preview render with missing variables"""
-    renderer = TemplateRenderer()
-    template = "Hello {{name}} {{surname}}!"
-    data = {"name": "John"}
-    
+@pytest.mark.parametrize("template,data,expected_success,expected_rendered,expected_missing", [
+    pytest.param("Hello {{name}}!", {"name": "John"}, True, "Hello John!", None, id="valid"),
+    pytest.param("Hello {{name}} {{surname}}!", {"name": "John"}, False, None, ["surname"], id="missing"),
+])
+def test_preview_render(renderer, template, data, expected_success, expected_rendered, expected_missing):
+    """Preview renders valid data and lists what is missing otherwise"""
     result = renderer.preview_render(template, data)
     
-    assert result["success"] is False
-    assert "surname" in result["missing_variables"]
-
-
-def test_render_empty_template():
-    """Test rendering empty template"""
-    renderer = TemplateRenderer()
-    template = ""
-    data = {}
-    
-    result = renderer.render(template, data)
-    
-    assert result == ""
+    assert result["success"] is expected_success
+    assert result.get("rendered") == expected_rendered
+    assert result.get("missing_variables") == expected_missing
+    if expected_success:
+        assert "name" in result["variables_used"]
 
 
-def test_render_template_without_variables():
-    """Test rendering template without any variables"""
-    renderer = TemplateRenderer()
-    template = "This is a static message."
-    data = {}
+def test_compiled_template_shared_between_renderers():
+    """Each template source is compiled once per process"""
+    template = "Hi {{name}}, your code is {{code}}"
     
-    result = renderer.render(template, data)
+    first = TemplateRenderer().render(template, {"name": "A", "code": "1"})
+    hits = compile_template.cache_info().hits
+    second = TemplateRenderer().render(template, {"name": "B", "code": "2"})
     
-    assert result == "This is a static message."
+    assert first == "Hi A, your code is 1"
+    assert second == "Hi B, your code is 2"
+    assert compile_template.cache_info().hits == hits + 1
 
 
-def test_extract_variables_from_empty_template():
-    """Test extracting variables from empty template"""
-    renderer = TemplateRenderer()
-    template = ""
+def test_warm_precompiles_templates(renderer):
+    """Warming compiles sources so the first render is a cache hit"""
+    template = "Warm {{greeting}}, {{name}}"
     
-    variables = renderer.extract_variables(template)
+    compiled = renderer.warm([template, None, "{% if %}"])
+    hits = compile_template.cache_info().hits
+    renderer.render(template, {"greeting": "hello", "name": "A"})
     
-    assert variables == []
+    assert compiled == 1
+    assert compile_template.cache_info().hits == hits + 1
 
 
-def test_variable_with_underscores():
-    """Test variables with underscores"""
-    renderer = TemplateRenderer()
-    template = "Hello {{first_name}} {{last_name}}!"
-    data = {"first_name": "John", "last_name": "Doe"}
+def test_variables_and_render_share_one_parse(renderer):
+    """Scanning variables and compiling reuse the same cached parse"""
+    template = "Shared parse for {{ name }}"
     
-    result = renderer.render(template, data)
+    misses = parse_template.cache_info().misses
+    renderer.extract_variables(template)
+    renderer.render(template, {"name": "A"})
     
-    assert result == "Hello John Doe!"
+    assert parse_template.cache_info().misses == misses + 1
 
 
-def test_variable_with_numbers():
-    """Test variables with numbers"""
-    renderer = TemplateRenderer()
-    template = "Code: {{code123}}"
-    data = {"code123": "ABC"}
+def test_render_cached_reuses_output_for_identical_data(renderer):
+    """Identical data (in any key order) renders once; different data renders fresh"""
+    template = "Cached {{greeting}}, {{name}}"
     
-    result = renderer.render(template, data)
+    first = renderer.render_cached(template, {"greeting": "hi", "name": "A"})
+    hits = compile_template.cache_info().hits
+    second = renderer.render_cached(template, {"name": "A", "greeting": "hi"})
+    third = renderer.render_cached(template, {"greeting": "hi", "name": "B"})
     
-    assert result == "Code: ABC"
\ No newline at end of file
+    assert first == second == "Cached hi, A"
+    assert third == "Cached hi, B"
+    # Only the third call reached Jinja
+    assert compile_template.cache_info().hits == hits + 1
@@ -4,39 +4,31 @@ Tests for template service business logic
 
 import pytest
 from app.services.template_service import TemplateService
-from app.schemas import TemplateCreate, TemplateUpdate
+from app.schemas import TemplateUpdate
 
 
-def test_create_template(db_session):
+def test_create_template(db_session, template_factory):
     """Test creating a template"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="test_email",
-        name="Test Email",
-        type="email",
-        subject="Hello {{name}}",
-        body="Welcome {{name}}!",
-        language_code="en"
+    template_data = template_factory(
+        "test_email", name="Test Email", subject="Hello {{name}}", body="Welcome {{name}}!"
     )
     
-    template = service.create_template(template_data)
+    template, version = service.create_template(template_data)
     
     assert template.template_id == "test_email"
+    assert version.version == "1.0.0"
+    assert version.is_current is True
+    assert version.variables == ["name"]  # shared by subject and body, stored once
     assert template.name == "Test Email"
     assert len(template.versions) == 1
     assert len(template.translations) == 1
 
 
-def test_create_duplicate_template(db_session):
+def test_create_duplicate_template(db_session, template_factory):
     """Test creating template with duplicate ID fails"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="duplicate",
-        name="Test",
-        type="email",
-        body="Test",
-        language_code="en"
-    )
+    template_data = template_factory("duplicate")
     
     service.create_template(template_data)
     
@@ -44,38 +36,106 @@ def test_create_duplicate_template(db_session):
         service.create_template(template_data)
 
 
-def test_get_template(db_session):
+@pytest.mark.parametrize("pgcode,constraint,expected", [
+    pytest.param("23505", "ix_templates_template_id_active", True, id="duplicate_template_id"),
+    pytest.param("23505", "ix_template_translations_template_language", False, id="other_unique_index"),
+    pytest.param("23503", "template_versions_template_id_fkey", False, id="foreign_key"),
+    pytest.param("23502", None, False, id="not_null"),
+])
+def test_is_duplicate_template_id_postgres(pgcode, constraint, expected):
+    """Only a unique violation on the template_id index counts as a duplicate"""
+    from types import SimpleNamespace
+    from sqlalchemy.exc import IntegrityError
+    from app.services.template_service import is_duplicate_template_id
+    
+    orig = SimpleNamespace(pgcode=pgcode, diag=SimpleNamespace(constraint_name=constraint))
+    
+    assert is_duplicate_template_id(IntegrityError("INSERT", {}, orig)) is expected
+
+
+def test_create_template_reraises_other_integrity_errors(db_session, template_factory):
+    """Integrity errors other than a duplicate id aren't reported as 'already exists'"""
+    from sqlalchemy.exc import IntegrityError
+    
+    service = TemplateService(db_session)
+    
+    with pytest.raises(IntegrityError, match="NOT NULL"):
+        service.create_template(template_factory("no_type").model_copy(update={"type": None}))
+
+
+def test_create_template_reuses_deleted_id(db_session, template_factory):
+    """A soft-deleted template's ID can be taken by a new template"""
+    service = TemplateService(db_session)
+    template_data = template_factory("reused")
+    
+    service.create_template(template_data)
+    service.delete_template("reused")
+    
+    template, _ = service.create_template(template_data)
+    assert template.is_active is True
+
+
+def test_get_template(db_session, template_factory):
     """Test getting a template by ID"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="get_test",
-        name="Get Test",
-        type="email",
-        body="Test",
-        language_code="en"
-    )
+    template_data = template_factory("get_test", name="Get Test")
     
-    created = service.create_template(template_data)
+    created, _ = service.create_template(template_data)
     retrieved = service.get_template("get_test")
     
     assert retrieved is not None
     assert retrieved.id == created.id
 
 
-def test_list_templates(db_session):
+def test_get_template_detail_cached_until_update(db_session, template_factory):
+    """Template detail is served from the in-process cache until a write"""
+    service = TemplateService(db_session)
+    service.create_template(template_factory("detail_test", name="Original"))
+    
+    detail = service.get_template_detail("detail_test")
+    assert detail["name"] == "Original"
+    assert len(detail["translations"]) == 1
+    
+    service.get_template = None  # a cache hit must not touch the DB
+    assert service.get_template_detail("detail_test") is detail
+    del service.get_template
+    
+    service.update_template("detail_test", TemplateUpdate(name="Renamed"))
+    assert service.get_template_detail("detail_test")["name"] == "Renamed"
+
+
+def test_get_template_detail_eager_loads_collections(db_session, template_factory):
+    """Building the detail dict never falls back to lazy loading"""
+    from sqlalchemy import event
+    from sqlalchemy.orm import raiseload
+    
+    service = TemplateService(db_session)
+    service.create_template(template_factory("eager_test", name="Eager"))
+    db_session.expunge_all()
+    
+    def forbid_lazy_loads(execute_state):
+        if execute_state.is_select:
+            execute_state.statement = execute_state.statement.options(raiseload("*"))
+    
+    event.listen(db_session, "do_orm_execute", forbid_lazy_loads)
+    try:
+        detail = service.get_template_detail("eager_test")
+    finally:
+        event.remove(db_session, "do_orm_execute", forbid_lazy_loads)
+    
+    assert len(detail["versions"]) == 1
+    assert len(detail["translations"]) == 1
+
+
+def test_list_templates(db_session, sample_template_model):
     """Test listing templates with pagination"""
     service = TemplateService(db_session)
     
     # Create multiple templates
     for i in range(5):
-        template_data = TemplateCreate(
-            template_id=f"test_{i}",
-            name=f"Test {i}",
-            type="email",
-            body="Test",
-            language_code="en"
-        )
-        service.create_template(template_data)
+        service.create_template(sample_template_model.model_copy(
+            update={"template_id": f"test_{i}", "name": f"Test {i}"}
+        ))
     
     templates, total = service.list_templates(skip=0, limit=10)
     
@@ -83,83 +143,96 @@ def test_list_templates(db_session):
     assert total == 5
 
 
-def test_list_templates_with_filter(db_session):
+def test_list_templates_multi_word_search_without_search_vector(db_session, template_factory):
+    """Without the search_vec column multi-word search falls back to substring matching"""
+    service = TemplateService(db_session)
+    service.create_template(template_factory("welcome", name="Welcome email"))
+    service.create_template(template_factory("reset", name="Password reset"))
+    
+    templates, total = service.list_templates(search="welcome email")
+    
+    assert total == 1
+    assert templates[0][0].template_id == "welcome"
+
+
+def test_full_text_search_ranks_matches():
+    """Multi-word search matches search_vec and ranks by ts_rank"""
+    from sqlalchemy.dialects import postgresql
+    from app.services.template_service import full_text_search
+    
+    condition, rank = full_text_search("welcome email")
+    dialect = postgresql.dialect()
+    
+    assert str(condition.compile(dialect=dialect)) == (
+        "templates.search_vec @@ websearch_to_tsquery(%(websearch_to_tsquery_1)s, %(websearch_to_tsquery_2)s)"
+    )
+    assert str(rank.compile(dialect=dialect)).startswith("ts_rank(templates.search_vec, websearch_to_tsquery(")
+
+
+def test_list_templates_with_filter(db_session, template_factory):
     """Test listing templates with type filter"""
     service = TemplateService(db_session)
     
     # Create email and push templates
-    service.create_template(TemplateCreate(
-        template_id="email1",
-        name="Email",
-        type="email",
-        body="Test",
-        language_code="en"
-    ))
-    service.create_template(TemplateCreate(
-        template_id="push1",
-        name="Push",
-        type="push",
-        body="Test",
-        language_code="en"
-    ))
+    service.create_template(template_factory("email1", name="Email"))
+    service.create_template(template_factory("push1", name="Push", type="push"))
     
     templates, total = service.list_templates(type="email")
     
     assert len(templates) == 1
-    assert templates[0].type == "email"
+    template, current_version = templates[0]
+    assert template.type == "email"
+    assert current_version.version == "1.0.0"
 
 
-def test_update_template(db_session):
+def test_update_template(db_session, template_factory):
     """Test updating template basic fields"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="update_test",
-        name="Original",
-        type="email",
-        body="Original body",
-        language_code="en"
-    )
+    template_data = template_factory("update_test", name="Original", body="Original body")
     
     service.create_template(template_data)
     
     update_data = TemplateUpdate(name="Updated Name")
-    updated = service.update_template("update_test", update_data)
+    updated, version = service.update_template("update_test", update_data)
     
     assert updated.name == "Updated Name"
+    assert version.version == "1.0.0"
 
 
-def test_update_template_creates_new_version(db_session):
+def test_update_template_creates_new_version(db_session, template_factory):
     """Test updating template body creates new version"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="version_test",
-        name="Test",
-        type="email",
-        body="Version 1.0.0",
-        language_code="en"
-    )
+    template_data = template_factory("version_test", body="Version 1.0.0")
     
-    created = service.create_template(template_data)
+    created, _ = service.create_template(template_data)
     assert len(created.versions) == 1
     
     update_data = TemplateUpdate(body="Version 1.0.1")
-    updated = service.update_template("version_test", update_data)
+    updated, version = service.update_template("version_test", update_data)
+    assert version.version == "1.0.1"
+    assert version.is_current is True
     
     # Refresh to get versions
     db_session.refresh(updated)
     assert len(updated.versions) == 2
 
 
-def test_delete_template(db_session):
+def test_version_metadata_persisted(db_session, template_factory):
+    """Version metadata is written to the mapped column"""
+    service = TemplateService(db_session)
+    service.create_template(template_factory("metadata_test", body="Version 1.0.0"))
+    _, version = service.update_template("metadata_test", TemplateUpdate(body="Version 1.0.1"))
+    
+    db_session.expire_all()
+    versions = {v.version: v for v in service.get_template_versions("metadata_test")}
+    assert versions["1.0.0"].template_metadata == {"initial_version": True}
+    assert versions["1.0.1"].template_metadata == {"updated_from": "1.0.0"}
+
+
+def test_delete_template(db_session, template_factory):
     """Test soft deleting a template"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="delete_test",
-        name="Delete Test",
-        type="email",
-        body="Test",
-        language_code="en"
-    )
+    template_data = template_factory("delete_test", name="Delete Test")
     
     service.create_template(template_data)
     success = service.delete_template("delete_test")
@@ -171,16 +244,12 @@ def test_delete_template(db_session):
     assert deleted is None
 
 
-def test_render_template(db_session):
+def test_render_template(db_session, template_factory):
     """Test rendering a template"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="render_test",
-        name="Render Test",
-        type="email",
-        subject="Hello {{name}}",
-        body="Welcome {{name}} to {{company}}!",
-        language_code="en"
+    template_data = template_factory(
+        "render_test", name="Render Test",
+        subject="Hello {{name}}", body="Welcome {{name}} to {{company}}!"
     )
     
     service.create_template(template_data)
@@ -197,16 +266,10 @@ def test_render_template(db_session):
     assert "Acme" in result["body"]
 
 
-def test_render_template_missing_variables(db_session):
+def test_render_template_missing_variables(db_session, template_factory):
     """Test rendering fails with missing variables"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="missing_vars",
-        name="Test",
-        type="email",
-        body="Hello {{name}} and {{friend}}!",
-        language_code="en"
-    )
+    template_data = template_factory("missing_vars", body="Hello {{name}} and {{friend}}!")
     
     service.create_template(template_data)
     
@@ -214,16 +277,85 @@ def test_render_template_missing_variables(db_session):
         service.render_template("missing_vars", {"name": "John"}, "en")
 
 
-def test_add_translation(db_session):
+def test_render_template_default_filter(db_session, template_factory):
+    """Variables with a default aren't required"""
+    service = TemplateService(db_session)
+    service.create_template(template_factory("defaulted", body="Hi {{ name | default('there') }}"))
+    
+    result = service.render_template("defaulted", {}, "en")
+    
+    assert result["body"] == "Hi there"
+
+
+class DictCache:
+    """In-memory stand-in for CacheClient"""
+    
+    def __init__(self):
+        self.store = {}
+    
+    def get(self, key):
+        return self.store.get(key)
+    
+    def set(self, key, value, ttl=300):
+        self.store[key] = value
+        return True
+    
+    def incr(self, key):
+        self.store[key] = self.store.get(key, 0) + 1
+        return self.store[key]
+    
+    def delete(self, key):
+        self.store.pop(key, None)
+        return True
+    
+    def delete_pattern(self, pattern):
+        prefix = pattern.rstrip("*")
+        for key in [k for k in self.store if k.startswith(prefix)]:
+            del self.store[key]
+        return True
+
+
+def test_render_template_cached_until_translation_changes(db_session, template_factory):
+    """Identical renders come from the cache; translation changes invalidate them"""
+    service = TemplateService(db_session)
+    service.cache = DictCache()
+    service.create_template(template_factory("cached_render", body="Hello {{name}}!"))
+    
+    first = service.render_template("cached_render", {"name": "John"}, "en")
+    assert any(k.startswith("rt:cached_render:0:en:") for k in service.cache.store)
+    
+    service.get_template = None  # a cache hit must not touch the DB
+    assert service.render_template("cached_render", {"name": "John"}, "en") == first
+    del service.get_template
+    
+    service.add_translation("cached_render", "en", None, "Bye {{name}}!")
+    result = service.render_template("cached_render", {"name": "John"}, "en")
+    assert result["body"] == "Bye John!"
+
+
+def test_template_detail_invalidated_by_other_worker(db_session, template_factory):
+    """A write in another worker bumps the shared generation and evicts this worker's copy"""
+    from app.models import Template
+    
+    service = TemplateService(db_session)
+    service.cache = DictCache()
+    service.create_template(template_factory("shared", name="Original"))
+    assert service.get_template_detail("shared")["name"] == "Original"
+    
+    # Another worker renames the template: the DB and the Redis generation
+    # change, but this process' template cache is not touched
+    db_session.query(Template).filter(Template.template_id == "shared").update({"name": "Renamed"})
+    db_session.commit()
+    assert service.get_template_detail("shared")["name"] == "Original"
+    
+    service.cache.incr("tpl:gen:shared")
+    assert service.get_template_detail("shared")["name"] == "Renamed"
+
+
+def test_add_translation(db_session, template_factory):
     """Test adding a translation"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="translation_test",
-        name="Test",
-        type="email",
-        body="Hello {{name}}!",
-        language_code="en"
-    )
+    template_data = template_factory("translation_test", body="Hello {{name}}!")
     
     service.create_template(template_data)
     
@@ -238,16 +370,38 @@ def test_add_translation(db_session):
     assert translation.language_code == "es"
 
 
-def test_render_template_with_translation(db_session):
+def test_add_translation_updates_existing(db_session, template_factory):
+    """Adding a translation twice updates the same row"""
+    service = TemplateService(db_session)
+    service.create_template(template_factory("upsert_test", body="Hello {{name}}!"))
+    
+    first = service.add_translation("upsert_test", "es", None, "Hola {{name}}")
+    second = service.add_translation("upsert_test", "es", "Asunto", "¡Hola {{name}}!")
+    
+    assert second.id == first.id
+    assert second.subject == "Asunto"
+    assert second.body == "¡Hola {{name}}!"
+    assert service.add_translation("missing_template", "es", None, "Hola") is None
+
+
+def test_add_translation_skips_template_load(db_session, template_factory, monkeypatch):
+    """add_translation resolves the template id without get_template"""
+    service = TemplateService(db_session)
+    service.create_template(template_factory("light_lookup", body="Hello {{name}}!"))
+    service.create_template(template_factory("retired", body="Bye"))
+    service.delete_template("retired")
+    monkeypatch.setattr(service, "get_template", lambda *a: pytest.fail("get_template called"))
+    
+    translation = service.add_translation("light_lookup", "fr", None, "Bonjour {{name}}!")
+    
+    assert translation.body == "Bonjour {{name}}!"
+    assert service.add_translation("retired", "fr", None, "Au revoir") is None
+
+
+def test_render_template_with_translation(db_session, template_factory):
     """Test rendering template with different language"""
     service = TemplateService(db_session)
-    template_data = TemplateCreate(
-        template_id="multi_lang",
-        name="Test",
-        type="email",
-        body="Hello {{name}}!",
-        language_code="en"
-    )
+    template_data = template_factory("multi_lang", body="Hello {{name}}!")
     
     service.create_template(template_data)
     service.add_translation("multi_lang", "es", None, "¡Hola {{name}}!")
@@ -255,4 +409,44 @@ def test_render_template_with_translation(db_session):
     result = service.render_template("multi_lang", {"name": "Juan"}, "es")
     
     assert result is not None
-    assert "¡Hola Juan!" in result["body"]
\ No newline at end of file
+    assert "¡Hola Juan!" in result["body"]
+
+def test_render_template_normalizes_language_code(db_session, template_factory):
+    """Language codes match stored translations regardless of case"""
+    service = TemplateService(db_session)
+    service.create_template(template_factory("lang_case", body="Hello {{name}}!"))
+    service.add_translation("lang_case", "es", None, "¡Hola {{name}}!")
+    
+    result = service.render_template("lang_case", {"name": "Juan"}, " ES ")
+    
+    assert result["body"] == "¡Hola Juan!"
+
+
+def test_get_statistics(db_session, template_factory):
+    """Statistics count only active templates and translations"""
+    service = TemplateService(db_session)
+    for template_id, template_type in (("stats_a", "email"), ("stats_b", "email"), ("stats_c", "push")):
+        service.create_template(
+            template_factory(template_id, name="Stats", type=template_type, body="Hello {{name}}")
+        )
+    service.update_template("stats_a", TemplateUpdate(body="Hi {{name}}"))
+    service.delete_template("stats_b")
+    
+    stats = service.get_statistics()
+    
+    assert stats["total_templates"] == 2
+    assert stats["total_versions"] == 4
+    assert stats["total_translations"] == 3
+    assert stats["templates_by_type"] == {"email": 1, "push": 1, "sms": 0}
+
+
+def test_warm_renderer_compiles_active_translations(db_session, template_factory):
+    """Startup warm-up covers subject and body of active templates only"""
+    service = TemplateService(db_session)
+    for template_id in ("warm_a", "warm_b"):
+        service.create_template(template_factory(
+            template_id, name="Warm", subject="Subject {{name}}", body=f"Body for {template_id} {{{{name}}}}"
+        ))
+    service.delete_template("warm_b")
+    
+    assert service.warm_renderer() == 2